@@ -0,0 +1,204 @@
+"""Admission control with per-lane concurrency limits and priority.
+
+Routes are grouped into lanes. Each lane has its own concurrency limit and a
+bounded wait queue, and every lane also draws from one shared pool of
+ADMISSION_CAPACITY slots. When a slot frees up it goes to the waiting request
+in the highest-priority lane (lowest number) that is still under its own
+limit, so interactive queries overtake queued ingestion work.
+
+A request that finds its lane's queue full, or that waits longer than the
+lane's max_wait, is rejected immediately with a Retry-After estimate instead
+of piling more work onto the event loop, MongoDB and the LLM provider.
+
+AdmissionMiddleware applies this at the ASGI layer, before the request body
+is received, so a rejected upload is turned away without being spooled.
+"""
+import asyncio
+import json
+import logging
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a lane's queue is full or a request waited too long"""
+
+    def __init__(self, lane: str, reason: str, retry_after: int):
+        super().__init__(f"{lane} lane {reason}")
+        self.lane = lane
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Lane:
+    """Limits and counters for one class of traffic"""
+
+    def __init__(self, name: str, priority: int, max_concurrency: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.priority = priority
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        # Exponentially weighted mean of how long an admitted request holds its slot
+        self.avg_service_s = 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'priority': self.priority,
+            'active': self.active,
+            'queued': len(self.waiters),
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out,
+            'avg_service_ms': self.avg_service_s * 1000,
+        }
+
+
+class Permit:
+    """A held slot; pass it back to AdmissionController.release"""
+
+    def __init__(self, lane: Lane):
+        self.lane = lane
+        self.started = time.monotonic()
+
+
+class AdmissionController:
+    """Shared slot pool handed out to lanes in priority order"""
+
+    SERVICE_TIME_WEIGHT = 0.2
+    MAX_RETRY_AFTER = 60
+
+    def __init__(self, capacity: int, lanes: List[Lane]):
+        self.capacity = capacity
+        self.active = 0
+        self.lanes = {lane.name: lane for lane in lanes}
+        self._by_priority = sorted(lanes, key=lambda lane: lane.priority)
+
+    def _has_slot(self, lane: Lane) -> bool:
+        return self.active < self.capacity and lane.active < lane.max_concurrency
+
+    def _grant(self, lane: Lane):
+        self.active += 1
+        lane.active += 1
+        lane.admitted += 1
+
+    def _dispatch(self):
+        """Hand free slots to waiters, highest-priority lane first"""
+        for lane in self._by_priority:
+            while lane.waiters and self._has_slot(lane):
+                waiter = lane.waiters.popleft()
+                if waiter.done():
+                    continue
+                self._grant(lane)
+                waiter.set_result(None)
+            if self.active >= self.capacity:
+                return
+
+    def retry_after(self, lane: Lane) -> int:
+        """Seconds until the lane is likely to have room, from queue depth and service time"""
+        backlog = len(lane.waiters) + lane.active
+        estimate = backlog * max(lane.avg_service_s, 0.1) / lane.max_concurrency
+        return max(1, min(self.MAX_RETRY_AFTER, math.ceil(estimate)))
+
+    async def acquire(self, name: str) -> Permit:
+        """Wait for a slot in the named lane, or raise AdmissionRejected"""
+        lane = self.lanes[name]
+        if not lane.waiters and self._has_slot(lane):
+            self._grant(lane)
+            return Permit(lane)
+
+        if len(lane.waiters) >= lane.max_queue:
+            lane.rejected += 1
+            raise AdmissionRejected(lane.name, "queue is full", self.retry_after(lane))
+
+        waiter = asyncio.get_running_loop().create_future()
+        lane.waiters.append(waiter)
+        try:
+            # Unlike wait_for, wait never swallows a cancellation that races the grant
+            await asyncio.wait((waiter,), timeout=lane.max_wait)
+        except asyncio.CancelledError:
+            self._abandon(lane, waiter)
+            raise
+        if not waiter.done():
+            self._abandon(lane, waiter)
+            lane.timed_out += 1
+            lane.rejected += 1
+            raise AdmissionRejected(lane.name, "wait timed out", self.retry_after(lane))
+        return Permit(lane)
+
+    def _abandon(self, lane: Lane, waiter: asyncio.Future):
+        """Withdraw a waiter that gave up, passing on a slot it was granted meanwhile"""
+        if waiter.done():
+            self.release(Permit(lane), record=False)
+        else:
+            waiter.cancel()
+            lane.waiters.remove(waiter)
+
+    def release(self, permit: Permit, record: bool = True):
+        """Return a slot and wake the next eligible waiter"""
+        lane = permit.lane
+        self.active -= 1
+        lane.active -= 1
+        if record:
+            elapsed = time.monotonic() - permit.started
+            weight = self.SERVICE_TIME_WEIGHT if lane.avg_service_s else 1.0
+            lane.avg_service_s += weight * (elapsed - lane.avg_service_s)
+        self._dispatch()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            'capacity': self.capacity,
+            'active': self.active,
+            'lanes': {name: lane.stats() for name, lane in self.lanes.items()},
+        }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that holds a lane slot for each routed request, taken before its body is read"""
+
+    def __init__(self, app, controller: AdmissionController, routes: Dict[Tuple[str, str], str]):
+        self.app = app
+        self.controller = controller
+        # (method, path) -> lane name
+        self.routes = routes
+
+    async def __call__(self, scope, receive, send):
+        lane = self.routes.get((scope.get('method'), scope.get('path'))) if scope['type'] == 'http' else None
+        if lane is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            permit = await self.controller.acquire(lane)
+        except AdmissionRejected as e:
+            logger.warning(f"Rejected request: {e}")
+            await self.reject(send, e)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(permit)
+
+    @staticmethod
+    async def reject(send, error: AdmissionRejected):
+        body = json.dumps({'detail': f"Server busy ({error}). Please retry later."}).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 429,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', str(error.retry_after).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
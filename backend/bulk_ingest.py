@@ -0,0 +1,51 @@
+"""Offline bulk ingestion of a local directory into the RAG document store.
+
+Uses the same pipeline as POST /api/documents/bulk, reading MONGO_URL and
+DB_NAME from backend/.env. Example:
+
+    python bulk_ingest.py /data/corpus --report report.json
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+import server
+from ingest import BulkIngestReport, iter_directory_files
+
+
+async def run(directory: Path) -> BulkIngestReport:
+    try:
+        return await server.ingest_files(iter_directory_files(directory))
+    finally:
+        if server.extraction_pool is not None:
+            server.extraction_pool.shutdown()
+        if server.client is not None:
+            server.client.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Ingest every document in a directory")
+    parser.add_argument("directory", type=Path, help="Directory to ingest recursively")
+    parser.add_argument("--report", type=Path, help="Write the per-file JSON report to this path")
+    args = parser.parse_args()
+
+    if not args.directory.is_dir():
+        parser.error(f"{args.directory} is not a directory")
+
+    report = asyncio.run(run(args.directory))
+
+    for result in report.files:
+        if not result.success:
+            print(f"FAILED  {result.filename}: {result.error}", file=sys.stderr)
+    print(f"Ingested {report.succeeded}/{report.total_files} files "
+          f"({report.total_chunks} chunks) in {report.elapsed_ms / 1000:.1f}s")
+
+    if args.report:
+        args.report.write_text(report.model_dump_json(indent=2))
+
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Measure the cold-start cost of importing the API module.
+
+Each run imports the module in a fresh interpreter and records the import time,
+the peak RSS and which heavy libraries ended up loaded. --preload-extractors
+adds the cost an ingestion worker pays once it has seen every file type, for
+comparison with a query-only worker. --max-seconds / --max-rss-mb turn the
+report into a regression check. Example:
+
+    python coldstart_benchmark.py --runs 5
+    python coldstart_benchmark.py --preload-extractors --max-seconds 3
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+HEAVY_MODULES = (
+    'pymupdf', 'sklearn', 'pandas', 'pytesseract', 'pdf2image', 'pptx', 'docx',
+    'PIL', 'openpyxl', 'numpy', 'emergentintegrations', 'litellm',
+)
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+__import__({module!r})
+if {preload}:
+    import extractors
+    extractors.preload_extractors()
+elapsed = time.perf_counter() - start
+max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+max_rss_mb = max_rss / 2**20 if sys.platform == 'darwin' else max_rss / 2**10
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{'seconds': elapsed, 'max_rss_mb': max_rss_mb, 'loaded': loaded}}))
+"""
+
+
+class ProbeFailed(Exception):
+    """Raised when the probe interpreter exits with an error"""
+
+
+def probe(module: str, preload: bool) -> dict:
+    code = PROBE.format(module=module, preload=preload, heavy=HEAVY_MODULES)
+    try:
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=Path(__file__).parent,
+            capture_output=True, text=True, check=True
+        )
+    except subprocess.CalledProcessError as e:
+        # The child's traceback is in its captured stderr; surface it
+        raise ProbeFailed(f"importing {module} failed (exit {e.returncode}):\n{e.stderr.strip()}") from None
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark API module import time and RSS")
+    parser.add_argument("--module", default="server", help="Module to import (default: server)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--preload-extractors", action="store_true", help="Also import every extractor's libraries")
+    parser.add_argument("--max-seconds", type=float, help="Fail if the median import time exceeds this")
+    parser.add_argument("--max-rss-mb", type=float, help="Fail if the median peak RSS exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+
+    try:
+        baseline = probe('sys', False)
+        runs = [probe(args.module, args.preload_extractors) for _ in range(args.runs)]
+    except ProbeFailed as e:
+        print(f"FAIL: {e}", file=sys.stderr)
+        return 1
+    summary = {
+        'module': args.module,
+        'preload_extractors': args.preload_extractors,
+        'runs': args.runs,
+        'median_seconds': statistics.median(run['seconds'] for run in runs),
+        'median_max_rss_mb': statistics.median(run['max_rss_mb'] for run in runs),
+        'interpreter_rss_mb': baseline['max_rss_mb'],
+        'heavy_modules_loaded': runs[-1]['loaded'],
+    }
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"import {summary['module']}"
+              f"{' + extractors' if summary['preload_extractors'] else ''} ({summary['runs']} runs)")
+        print(f"  median import time : {summary['median_seconds'] * 1000:.0f} ms")
+        print(f"  median peak RSS    : {summary['median_max_rss_mb']:.1f} MB "
+              f"(bare interpreter {summary['interpreter_rss_mb']:.1f} MB)")
+        print(f"  heavy modules      : {', '.join(summary['heavy_modules_loaded']) or 'none'}")
+
+    failed = False
+    if args.max_seconds is not None and summary['median_seconds'] > args.max_seconds:
+        print(f"FAIL: import time above {args.max_seconds}s", file=sys.stderr)
+        failed = True
+    if args.max_rss_mb is not None and summary['median_max_rss_mb'] > args.max_rss_mb:
+        print(f"FAIL: peak RSS above {args.max_rss_mb} MB", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+"""Text extractors for uploaded documents, keyed by file type.
+
+Each extractor registers itself with the file extensions it handles and imports
+its parsing libraries (pymupdf, OCR, Office formats) inside the function body,
+so a worker only pays for a library the first time it sees that file type.
+Query-only workers never load them at all.
+"""
+import importlib
+import io
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+CELL_SEPARATOR = " | "
+
+
+class Segment(NamedTuple):
+    """Rows sharing a header; the chunker cuts between rows and repeats the header on every chunk"""
+    header: str
+    rows: List[str]
+
+
+# Extractors return plain text, or a list of segments (e.g. spreadsheet sheets)
+ExtractedText = Union[str, List[Segment]]
+
+
+def count_words(text: str) -> int:
+    """Count words for chunk budgets, ignoring spreadsheet cell separators"""
+    separator = CELL_SEPARATOR.strip()
+    return sum(1 for word in text.split() if word != separator)
+
+# Content that matches no extension or sniffer is treated as a PDF
+DEFAULT_FILE_TYPE = 'pdf'
+
+
+class Extractor:
+    """A registered file type handler"""
+
+    def __init__(self, file_type: str, extensions: Tuple[str, ...], extract: Callable[[bytes], ExtractedText],
+                 modules: Tuple[str, ...] = (), sniff: Optional[Callable[[bytes], bool]] = None):
+        self.file_type = file_type
+        self.extensions = extensions
+        self.extract = extract
+        self.modules = modules
+        self.sniff = sniff
+
+    def preload(self):
+        """Import this extractor's libraries ahead of its first file"""
+        for module in self.modules:
+            importlib.import_module(module)
+
+
+EXTRACTORS: Dict[str, Extractor] = {}
+
+
+def register_extractor(file_type: str, extensions: Tuple[str, ...], modules: Tuple[str, ...] = (),
+                       sniff: Optional[Callable[[bytes], bool]] = None):
+    """Register the decorated function as the extractor for file_type"""
+    def decorator(extract: Callable[[bytes], ExtractedText]) -> Callable[[bytes], ExtractedText]:
+        EXTRACTORS[file_type] = Extractor(file_type, extensions, extract, modules, sniff)
+        return extract
+    return decorator
+
+
+def preload_extractors():
+    """Import every extractor's libraries, e.g. in dedicated ingestion workers"""
+    for extractor in EXTRACTORS.values():
+        extractor.preload()
+
+
+@register_extractor('pdf', ('.pdf',), modules=('pymupdf', 'pdf2image', 'pytesseract'))
+def extract_text_from_pdf(file_content: bytes, use_ocr: bool = False) -> str:
+    """Extract text from PDF using pymupdf, with OCR fallback for scanned PDFs"""
+    import pymupdf
+    
+    try:
+        pdf_document = pymupdf.open(stream=file_content, filetype="pdf")
+        text = ""
+        for page_num in range(len(pdf_document)):
+            page = pdf_document[page_num]
+            page_text = page.get_text()
+            text += page_text
+        
+        # If text is minimal, try OCR (likely a scanned document)
+        if len(text.strip()) < 100 or use_ocr:
+            logger.info("Using OCR for PDF extraction")
+            import pytesseract
+            from pdf2image import convert_from_bytes
+            images = convert_from_bytes(file_content)
+            ocr_text = ""
+            for image in images:
+                ocr_text += pytesseract.image_to_string(image) + "\n\n"
+            return ocr_text if len(ocr_text) > len(text) else text
+        
+        return text
+    except Exception as e:
+        logger.error(f"Error extracting text from PDF: {e}")
+        raise
+
+
+def is_image(file_content: bytes) -> bool:
+    """Check whether content can be opened as an image"""
+    from PIL import Image
+    
+    try:
+        Image.open(io.BytesIO(file_content))
+        return True
+    except Exception:
+        return False
+
+
+@register_extractor('image', ('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.gif'), modules=('PIL.Image', 'pytesseract'), sniff=is_image)
+def extract_text_from_image(file_content: bytes) -> str:
+    """Extract text from images using OCR"""
+    import pytesseract
+    from PIL import Image
+    
+    try:
+        image = Image.open(io.BytesIO(file_content))
+        text = pytesseract.image_to_string(image)
+        return text
+    except Exception as e:
+        logger.error(f"Error extracting text from image: {e}")
+        raise
+
+
+@register_extractor('pptx', ('.ppt', '.pptx'), modules=('pptx',))
+def extract_text_from_pptx(file_content: bytes) -> str:
+    """Extract text from PowerPoint presentations"""
+    from pptx import Presentation
+    
+    try:
+        prs = Presentation(io.BytesIO(file_content))
+        text = ""
+        for slide in prs.slides:
+            for shape in slide.shapes:
+                if hasattr(shape, "text"):
+                    text += shape.text + "\n"
+                # Extract text from tables
+                if shape.has_table:
+                    table = shape.table
+                    for row in table.rows:
+                        for cell in row.cells:
+                            text += cell.text + " "
+                    text += "\n"
+        return text
+    except Exception as e:
+        logger.error(f"Error extracting text from PPTX: {e}")
+        raise
+
+
+@register_extractor('docx', ('.doc', '.docx'), modules=('docx',))
+def extract_text_from_docx(file_content: bytes) -> str:
+    """Extract text from Word documents"""
+    from docx import Document
+    
+    try:
+        doc = Document(io.BytesIO(file_content))
+        text = ""
+        
+        # Extract paragraphs
+        for paragraph in doc.paragraphs:
+            text += paragraph.text + "\n"
+        
+        # Extract text from tables
+        for table in doc.tables:
+            for row in table.rows:
+                for cell in row.cells:
+                    text += cell.text + " "
+            text += "\n"
+        
+        return text
+    except Exception as e:
+        logger.error(f"Error extracting text from DOCX: {e}")
+        raise
+
+
+# Widest header slice per segment; wider sheets are split into column windows
+# so every chunk still pairs its values with their column names
+EXCEL_HEADER_WORDS = 100
+
+
+def format_cell(value: Any) -> str:
+    """Render a spreadsheet cell compactly"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return " ".join(str(value).split())
+
+
+def join_cells(cells: List[str]) -> str:
+    """Join cells with the separator, dropping trailing empty cells"""
+    end = len(cells)
+    while end and not cells[end - 1]:
+        end -= 1
+    return CELL_SEPARATOR.join(cells[:end])
+
+
+def column_windows(header: List[str], max_words: int) -> List[Tuple[int, Optional[int]]]:
+    """Group columns so each window's header cells stay within max_words; the last window is open-ended"""
+    windows, start, words = [], 0, 0
+    for column, cell in enumerate(header):
+        cell_words = len(cell.split())
+        if column > start and words + cell_words > max_words:
+            windows.append((start, column))
+            start, words = column, 0
+        words += cell_words
+    windows.append((start, None))
+    return windows
+
+
+def iter_excel_segments(file_content: bytes, header_words: int = EXCEL_HEADER_WORDS) -> Iterator[Segment]:
+    """Stream each sheet's rows as segments headed by the sheet title and header row"""
+    from openpyxl import load_workbook
+    
+    # read_only streams the sheet XML row by row instead of building every cell
+    workbook = load_workbook(io.BytesIO(file_content), read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            windows = segments = None
+            for values in sheet.iter_rows(values_only=True):
+                cells = [format_cell(value) for value in values]
+                if not join_cells(cells):
+                    continue
+                if windows is None:
+                    windows = column_windows(cells, header_words)
+                    segments = []
+                    for start, end in windows:
+                        title = f"Sheet: {sheet.title}"
+                        if len(windows) > 1:
+                            title += f" (columns {start + 1}-{end or len(cells)})"
+                        segments.append(Segment(f"{title}\n{join_cells(cells[start:end])}", []))
+                    continue
+                for (start, end), segment in zip(windows, segments):
+                    line = join_cells(cells[start:end])
+                    if line:
+                        segment.rows.append(line)
+            yield from segments or ()
+    finally:
+        workbook.close()
+
+
+@register_extractor('excel', ('.xls', '.xlsx'), modules=('openpyxl',))
+def extract_text_from_excel(file_content: bytes) -> List[Segment]:
+    """Extract text from Excel files as header-prefixed segments per sheet"""
+    try:
+        return list(iter_excel_segments(file_content))
+    except Exception as e:
+        logger.error(f"Error extracting text from Excel: {e}")
+        raise
+
+
+def detect_file_type(filename: str, file_content: bytes) -> str:
+    """Detect file type from filename and content"""
+    filename_lower = filename.lower()
+    
+    for extractor in EXTRACTORS.values():
+        if filename_lower.endswith(extractor.extensions):
+            return extractor.file_type
+    
+    # Try to detect from content
+    for extractor in EXTRACTORS.values():
+        if extractor.sniff is not None and extractor.sniff(file_content):
+            return extractor.file_type
+    
+    return DEFAULT_FILE_TYPE
+
+
+def has_text(text: ExtractedText) -> bool:
+    """Check whether extracted text or segments contain anything besides whitespace"""
+    if isinstance(text, str):
+        return bool(text.strip())
+    return any(segment.rows or segment.header.strip() for segment in text)
+
+
+def extract_text_from_file(filename: str, file_content: bytes) -> tuple[ExtractedText, str]:
+    """Extract text from various file types"""
+    file_type = detect_file_type(filename, file_content)
+    
+    extractor = EXTRACTORS.get(file_type)
+    if extractor is None:
+        raise ValueError(f"Unsupported file type: {file_type}")
+    
+    return extractor.extract(file_content), file_type
+
+
+def extract_file_for_ingest(filename: str, file_content: bytes) -> Dict[str, Any]:
+    """Extract text from one file inside a pool worker, capturing failures for the report"""
+    try:
+        text, file_type = extract_text_from_file(filename, file_content)
+        if not has_text(text):
+            return {'filename': filename, 'file_type': file_type, 'error': f"No text could be extracted from the {file_type.upper()} file"}
+        return {'filename': filename, 'file_type': file_type, 'text': text, 'file_size': len(file_content)}
+    except Exception as e:
+        return {'filename': filename, 'error': str(e)}
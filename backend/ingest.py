@@ -0,0 +1,305 @@
+"""Document ingestion pipeline: chunking, record building and bulk ingestion.
+
+Shared by the upload endpoints and the offline bulk_ingest.py CLI. Text
+extraction (PDF parsing, OCR, Office formats) is CPU bound, so bulk ingestion
+runs it in a process pool; embeddings and Mongo writes are batched across
+files. A file that cannot be read or extracted is reported as a failed entry
+and never aborts the batch.
+"""
+import asyncio
+import logging
+import os
+import tarfile
+import time
+import uuid
+import zipfile
+from concurrent.futures import Executor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from pydantic import BaseModel
+
+from extractors import ExtractedText, Segment, count_words, extract_file_for_ingest
+
+logger = logging.getLogger(__name__)
+
+CHUNK_WORDS = 500
+BULK_WRITE_BATCH_SIZE = 1000
+BULK_EMBED_BATCH_SIZE = 256
+BULK_MAX_IN_FLIGHT_PER_WORKER = 2
+INGEST_WORKERS = int(os.environ.get('INGEST_WORKERS', os.cpu_count() or 1))
+
+# File iterators yield (name, content), or (name, exception) for an entry that
+# could not be read, so one bad member is reported instead of ending the batch
+IngestFile = tuple[str, Union[bytes, Exception]]
+
+
+class BulkIngestFileResult(BaseModel):
+    index: int
+    filename: str
+    success: bool
+    document_id: Optional[str] = None
+    file_type: Optional[str] = None
+    chunk_count: int = 0
+    error: Optional[str] = None
+
+
+class BulkIngestReport(BaseModel):
+    total_files: int
+    succeeded: int
+    failed: int
+    total_chunks: int
+    elapsed_ms: float
+    files: List[BulkIngestFileResult]
+
+
+def split_text_into_chunks(text: str, chunk_size: int = CHUNK_WORDS) -> List[str]:
+    """Split text into chunks"""
+    words = text.split()
+    chunks = []
+    for i in range(0, len(words), chunk_size):
+        chunk = ' '.join(words[i:i + chunk_size])
+        chunks.append(chunk)
+    return chunks
+
+
+def split_segments_into_chunks(segments: Iterable[Segment], chunk_size: int = CHUNK_WORDS) -> List[str]:
+    """Pack each segment's rows into chunks of at most chunk_size words, repeating its header on every chunk"""
+    chunks = []
+    for header, rows in segments:
+        header = header.strip()
+        budget = max(chunk_size - count_words(header), 1)
+        current, current_words = [], 0
+        for row in rows:
+            words = count_words(row)
+            if current and current_words + words > budget:
+                chunks.append('\n'.join([header, *current]))
+                current, current_words = [], 0
+            if words > budget:
+                # A single row wider than the budget is cut by words, still under its header
+                chunks.extend(f"{header}\n{piece}" for piece in split_text_into_chunks(row, budget))
+                continue
+            current.append(row)
+            current_words += words
+        if current or not rows:
+            chunks.append('\n'.join([header, *current]))
+    return chunks
+
+
+def build_document_records(filename: str, file_type: str, text: ExtractedText, file_size: int) -> tuple[Dict[str, Any], List[str]]:
+    """Build the document record and its text chunks for an extracted file"""
+    if isinstance(text, str):
+        chunks = split_text_into_chunks(text)
+        text_length = len(text)
+    else:
+        chunks = split_segments_into_chunks(text)
+        text_length = sum(len(header) + sum(len(row) for row in rows) for header, rows in text)
+    document = {
+        'id': str(uuid.uuid4()),
+        'filename': filename,
+        'file_type': file_type,
+        'upload_date': datetime.now(timezone.utc).isoformat(),
+        'file_size': file_size,
+        'text_length': text_length,
+        'chunk_count': len(chunks)
+    }
+    return document, chunks
+
+
+def build_chunk_records(document_id: str, chunks: List[str], embeddings: List[List[float]]) -> List[Dict[str, Any]]:
+    """Pair chunk texts with their embeddings, skipping empty chunks"""
+    return [{
+        'id': str(uuid.uuid4()),
+        'document_id': document_id,
+        'chunk_index': idx,
+        'text': chunk_text,
+        'embedding': embedding
+    } for idx, (chunk_text, embedding) in enumerate(zip(chunks, embeddings)) if chunk_text.strip()]
+
+
+def is_hidden_path(name: str) -> bool:
+    """Skip dotfiles and archive metadata such as __MACOSX resource forks"""
+    return any(part.startswith('.') or part == '__MACOSX' for part in name.split('/'))
+
+
+def iter_archive_files(archive_name: str, fileobj: BinaryIO) -> Iterator[IngestFile]:
+    """Yield (name, content) for each regular file in a zip or tar archive"""
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or is_hidden_path(info.filename):
+                    continue
+                try:
+                    content = archive.read(info)
+                except Exception as e:
+                    content = e
+                yield info.filename, content
+        return
+
+    fileobj.seek(0)
+    try:
+        archive = tarfile.open(fileobj=fileobj, mode='r:*')
+    except tarfile.TarError:
+        raise ValueError(f"{archive_name} is not a zip or tar archive")
+    with archive:
+        members = iter(archive)
+        while True:
+            try:
+                member = next(members)
+            except StopIteration:
+                return
+            except Exception as e:
+                # A corrupt header ends the tar stream; report it and keep what was read
+                yield archive_name, e
+                return
+            if not member.isfile() or is_hidden_path(member.name):
+                continue
+            try:
+                content = archive.extractfile(member).read()
+            except Exception as e:
+                content = e
+            yield member.name, content
+
+
+def iter_directory_files(root: Path) -> Iterator[IngestFile]:
+    """Yield (relative name, content) for each regular file under a directory"""
+    for path in sorted(root.rglob('*')):
+        relative = path.relative_to(root).as_posix()
+        if not path.is_file() or is_hidden_path(relative):
+            continue
+        try:
+            content = path.read_bytes()
+        except OSError as e:
+            content = e
+        yield relative, content
+
+
+class BulkWriter:
+    """Buffer document and chunk records and flush them with insert_many"""
+
+    def __init__(self, database, batch_size: int = BULK_WRITE_BATCH_SIZE):
+        self.database = database
+        self.batch_size = batch_size
+        self.documents: List[Dict[str, Any]] = []
+        self.chunks: List[Dict[str, Any]] = []
+
+    async def add(self, document: Dict[str, Any], chunks: List[Dict[str, Any]]):
+        self.documents.append(document)
+        self.chunks.extend(chunks)
+        if len(self.chunks) >= self.batch_size or len(self.documents) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        # Documents first so chunks never reference a missing parent
+        if self.documents:
+            await self.database.documents.insert_many(self.documents, ordered=False)
+            self.documents = []
+        if self.chunks:
+            await self.database.document_chunks.insert_many(self.chunks, ordered=False)
+            self.chunks = []
+
+
+async def ingest_files(files: Iterable[IngestFile], database, pool: Executor,
+                       generate_embeddings: Callable[[List[str]], Awaitable[List[List[float]]]],
+                       on_written: Callable[[Any], Awaitable[None]],
+                       max_in_flight: int = INGEST_WORKERS * BULK_MAX_IN_FLIGHT_PER_WORKER) -> BulkIngestReport:
+    """Extract, chunk, embed and store many files, returning a per-file report in input order
+
+    on_written(database) runs once the last batch is flushed, including when
+    the batch ends with an error, so chunks already stored become searchable.
+    max_in_flight bounds the number of files held in memory awaiting extraction.
+    """
+    start_time = time.time()
+    loop = asyncio.get_running_loop()
+    writer = BulkWriter(database)
+    results: List[BulkIngestFileResult] = []
+    pending: set = set()
+    # Extracted files waiting for one shared embedding call
+    batch: List[tuple[int, Dict[str, Any], List[str]]] = []
+    batch_chunks = 0
+
+    async def extract(position: int, filename: str, file_content: bytes):
+        return position, await loop.run_in_executor(pool, extract_file_for_ingest, filename, file_content)
+
+    async def embed_batch():
+        nonlocal batch, batch_chunks
+        if not batch:
+            return
+        embeddings = await generate_embeddings([chunk for _, _, chunks in batch for chunk in chunks])
+        offset = 0
+        for position, document, chunks in batch:
+            file_embeddings = embeddings[offset:offset + len(chunks)]
+            offset += len(chunks)
+            await writer.add(document, build_chunk_records(document['id'], chunks, file_embeddings))
+            results.append(BulkIngestFileResult(
+                index=position,
+                filename=document['filename'],
+                success=True,
+                document_id=document['id'],
+                file_type=document['file_type'],
+                chunk_count=document['chunk_count']
+            ))
+        batch, batch_chunks = [], 0
+
+    async def collect(position: int, extracted: Dict[str, Any]):
+        nonlocal batch_chunks
+        if 'error' in extracted:
+            logger.warning(f"Bulk ingest skipped {extracted['filename']}: {extracted['error']}")
+            results.append(BulkIngestFileResult(index=position, success=False, **extracted))
+            return
+        document, chunks = build_document_records(
+            extracted['filename'], extracted['file_type'], extracted['text'], extracted['file_size']
+        )
+        batch.append((position, document, chunks))
+        batch_chunks += len(chunks)
+        if batch_chunks >= BULK_EMBED_BATCH_SIZE:
+            await embed_batch()
+
+    async def drain(return_when):
+        nonlocal pending
+        done, pending = await asyncio.wait(pending, return_when=return_when)
+        for task in done:
+            await collect(*task.result())
+
+    try:
+        # Archive members are decompressed (and files read) off the event loop
+        files = iter(files)
+        position = 0
+        while (item := await asyncio.to_thread(next, files, None)) is not None:
+            filename, file_content = item
+            if isinstance(file_content, Exception):
+                await collect(position, {'filename': filename, 'error': str(file_content) or type(file_content).__name__})
+            else:
+                pending.add(asyncio.create_task(extract(position, filename, file_content)))
+                if len(pending) >= max_in_flight:
+                    await drain(asyncio.FIRST_COMPLETED)
+            position += 1
+        if pending:
+            await drain(asyncio.ALL_COMPLETED)
+        await embed_batch()
+    except BaseException:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        raise
+    finally:
+        # Whatever was buffered is stored and made searchable even if the batch failed
+        try:
+            await writer.flush()
+        finally:
+            await on_written(database)
+
+    results.sort(key=lambda r: r.index)
+    succeeded = sum(1 for r in results if r.success)
+    report = BulkIngestReport(
+        total_files=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        total_chunks=sum(r.chunk_count for r in results),
+        elapsed_ms=(time.time() - start_time) * 1000,
+        files=results
+    )
+    logger.info(f"Bulk ingest stored {report.succeeded}/{report.total_files} files with {report.total_chunks} chunks")
+    return report
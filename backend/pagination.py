@@ -0,0 +1,88 @@
+"""Keyset pagination and NDJSON streaming for Motor cursors.
+
+Pages are addressed with keyset (seek) cursors rather than skip/offset, so
+fetching page N costs the same as fetching page 1. Continuation tokens are
+opaque to clients: base64url-encoded JSON holding the last seen sort key.
+"""
+import base64
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+
+MAX_DOCUMENTS_PAGE_SIZE = 1000
+MAX_TELEMETRY_PAGE_SIZE = 100
+STREAM_BATCH_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Sort orders the seek filters below assume; _id breaks timestamp ties
+DOCUMENTS_SORT = [("_id", 1)]
+TELEMETRY_SORT = [("timestamp", -1), ("_id", -1)]
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """Encode a keyset position as an opaque continuation token"""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """Decode a continuation token produced by encode_cursor"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        position['oid'] = ObjectId(position['oid'])
+        return position
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def documents_page_filter(cursor: Optional[str]) -> Dict[str, Any]:
+    """Build the seek filter for documents ordered by _id ascending"""
+    if not cursor:
+        return {}
+    position = decode_cursor(cursor)
+    return {'_id': {'$gt': position['oid']}}
+
+
+def documents_cursor_for(doc: Dict[str, Any]) -> str:
+    return encode_cursor({'oid': str(doc['_id'])})
+
+
+def telemetry_page_filter(cursor: Optional[str]) -> Dict[str, Any]:
+    """Build the seek filter for telemetry ordered by (timestamp, _id) descending"""
+    if not cursor:
+        return {}
+    position = decode_cursor(cursor)
+    # A documents cursor has no ts; a crafted one could carry a query operator
+    if not isinstance(position.get('ts'), str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {'$or': [
+        {'timestamp': {'$lt': position['ts']}},
+        {'timestamp': position['ts'], '_id': {'$lt': position['oid']}}
+    ]}
+
+
+def telemetry_cursor_for(record: Dict[str, Any]) -> str:
+    return encode_cursor({'ts': record.get('timestamp'), 'oid': str(record['_id'])})
+
+
+async def fetch_page(cursor, limit: int, cursor_for) -> tuple[List[Dict[str, Any]], Optional[str]]:
+    """Read one page plus a look-ahead record to decide whether another page exists"""
+    records = await cursor.limit(limit + 1).to_list(limit + 1)
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = cursor_for(records[-1])
+    for record in records:
+        record.pop('_id', None)
+    return records, next_cursor
+
+
+async def stream_ndjson(cursor) -> AsyncIterator[bytes]:
+    """Yield records from a Motor cursor as NDJSON lines, one batch in memory at a time"""
+    async for record in cursor.batch_size(STREAM_BATCH_SIZE):
+        record.pop('_id', None)
+        yield (json.dumps(record, default=str) + "\n").encode()
@@ -0,0 +1,79 @@
+"""Report memory saved and recall lost by each embedding quantization mode.
+
+Reads chunk embeddings from MongoDB (MONGO_URL / DB_NAME from backend/.env),
+or generates a synthetic corpus with --synthetic. Queries are stored vectors
+with Gaussian noise added, and recall@k is measured against exact cosine
+search over full-precision vectors. Example:
+
+    python quantization_report.py --k 10 --rescore 200 --queries 200
+    python quantization_report.py --synthetic 100000 --dim 384
+"""
+import argparse
+import asyncio
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from vector_index import QUANTIZATION_MODES, QuantizedVectorIndex, recall_at_k
+
+
+async def load_vectors(limit: int) -> np.ndarray:
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ.get('MONGO_URL', 'mongodb://localhost:27017'))
+    database = client[os.environ.get('DB_NAME', 'rag_assistant_db')]
+    rows = []
+    cursor = database.document_chunks.find({}, {"_id": 0, "embedding": 1})
+    if limit:
+        cursor = cursor.limit(limit)
+    async for chunk in cursor:
+        rows.append(np.asarray(chunk['embedding'], dtype=np.float32))
+    client.close()
+    return np.vstack(rows) if rows else np.empty((0, 0), dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare quantization modes for chunk retrieval")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N random vectors instead of MongoDB")
+    parser.add_argument("--dim", type=int, default=384, help="Dimensions for synthetic vectors")
+    parser.add_argument("--limit", type=int, default=0, help="Read at most this many chunks from MongoDB")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore", type=int, default=200, help="Candidates rescored at full precision")
+    parser.add_argument("--noise", type=float, default=0.05, help="Query noise relative to vector norm")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.synthetic:
+        vectors = rng.random((args.synthetic, args.dim), dtype=np.float32)
+    else:
+        vectors = asyncio.run(load_vectors(args.limit))
+    if not len(vectors):
+        raise SystemExit("No vectors to evaluate")
+
+    picks = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+    norms = np.linalg.norm(vectors[picks], axis=1, keepdims=True)
+    queries = vectors[picks] + rng.normal(size=(len(picks), vectors.shape[1])).astype(np.float32) * norms * args.noise
+
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, "
+          f"k={args.k}, rescore={args.rescore}")
+    print(f"{'mode':<8}{'index MB':>10}{'saved':>8}{'ratio':>8}{'recall@k':>10}{'ms/query':>10}")
+    for mode in QUANTIZATION_MODES:
+        index = QuantizedVectorIndex([str(i) for i in range(len(vectors))], vectors, mode)
+        report = index.memory_report()
+        start = time.perf_counter()
+        for query in queries:
+            index.search(query, args.rescore if mode != 'none' else args.k)
+        scan_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        recall = recall_at_k(vectors, queries, mode, args.k, args.rescore, index=index)
+        saved = 1 - report['index_bytes'] / report['float32_bytes']
+        print(f"{mode:<8}{report['index_bytes'] / 2**20:>10.2f}{saved:>8.1%}"
+              f"{report['compression_ratio']:>7.1f}x{recall:>10.3f}{scan_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Response
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
 import os
 import logging
 from pathlib import Path
@@ -9,20 +11,27 @@ from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timezone
-import pymupdf
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 import time
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 import asyncio
-from PIL import Image
-import pytesseract
-from pdf2image import convert_from_bytes
-from pptx import Presentation
-from docx import Document
-import io
-import pandas as pd
-from typing import BinaryIO
+from typing import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from vector_index import QUANTIZATION_MODES, QuantizedVectorIndex, exact_scores
+import shard_search
+from pagination import (
+    MAX_DOCUMENTS_PAGE_SIZE, MAX_TELEMETRY_PAGE_SIZE, STREAM_BATCH_SIZE, NEXT_CURSOR_HEADER,
+    DOCUMENTS_SORT, TELEMETRY_SORT, documents_page_filter, documents_cursor_for,
+    telemetry_page_filter, telemetry_cursor_for, fetch_page, stream_ndjson
+)
+from extractors import extract_text_from_file, has_text
+import ingest
+from ingest import (
+    INGEST_WORKERS, BulkIngestReport, IngestFile, build_chunk_records, build_document_records,
+    iter_archive_files
+)
+from admission import AdmissionController, AdmissionMiddleware, Lane
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -69,6 +78,9 @@ class DocumentResponse(BaseModel):
     upload_date: str
     file_size: int
 
+# Listing and NDJSON export return the same fields; _id drives the keyset cursor
+DOCUMENT_LIST_PROJECTION = {'_id': 1, **{field: 1 for field in DocumentResponse.model_fields}}
+
 class QueryRequest(BaseModel):
     query: str
     top_k: int = 3
@@ -111,184 +123,241 @@ async def generate_embedding(text: str) -> List[float]:
         logger.error(f"Error generating embedding: {e}")
         raise
 
-def split_text_into_chunks(text: str, chunk_size: int = 500) -> List[str]:
-    """Split text into chunks"""
-    words = text.split()
-    chunks = []
-    for i in range(0, len(words), chunk_size):
-        chunk = ' '.join(words[i:i + chunk_size])
-        chunks.append(chunk)
-    return chunks
-
-def extract_text_from_pdf(file_content: bytes, use_ocr: bool = False) -> str:
-    """Extract text from PDF using pymupdf, with OCR fallback for scanned PDFs"""
-    try:
-        pdf_document = pymupdf.open(stream=file_content, filetype="pdf")
-        text = ""
-        for page_num in range(len(pdf_document)):
-            page = pdf_document[page_num]
-            page_text = page.get_text()
-            text += page_text
-        
-        # If text is minimal, try OCR (likely a scanned document)
-        if len(text.strip()) < 100 or use_ocr:
-            logger.info("Using OCR for PDF extraction")
-            images = convert_from_bytes(file_content)
-            ocr_text = ""
-            for image in images:
-                ocr_text += pytesseract.image_to_string(image) + "\n\n"
-            return ocr_text if len(ocr_text) > len(text) else text
-        
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting text from PDF: {e}")
-        raise
-
-def extract_text_from_image(file_content: bytes) -> str:
-    """Extract text from images using OCR"""
-    try:
-        image = Image.open(io.BytesIO(file_content))
-        text = pytesseract.image_to_string(image)
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting text from image: {e}")
-        raise
-
-def extract_text_from_pptx(file_content: bytes) -> str:
-    """Extract text from PowerPoint presentations"""
-    try:
-        prs = Presentation(io.BytesIO(file_content))
-        text = ""
-        for slide in prs.slides:
-            for shape in slide.shapes:
-                if hasattr(shape, "text"):
-                    text += shape.text + "\n"
-                # Extract text from tables
-                if shape.has_table:
-                    table = shape.table
-                    for row in table.rows:
-                        for cell in row.cells:
-                            text += cell.text + " "
-                    text += "\n"
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting text from PPTX: {e}")
-        raise
-
-def extract_text_from_docx(file_content: bytes) -> str:
-    """Extract text from Word documents"""
-    try:
-        doc = Document(io.BytesIO(file_content))
-        text = ""
-        
-        # Extract paragraphs
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        
-        # Extract text from tables
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    text += cell.text + " "
-            text += "\n"
-        
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting text from DOCX: {e}")
-        raise
-
-def extract_text_from_excel(file_content: bytes) -> str:
-    """Extract text from Excel files"""
-    try:
-        df = pd.read_excel(io.BytesIO(file_content), sheet_name=None)
-        text = ""
-        for sheet_name, sheet_df in df.items():
-            text += f"\n=== Sheet: {sheet_name} ===\n"
-            text += sheet_df.to_string(index=False) + "\n\n"
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting text from Excel: {e}")
-        raise
-
-def detect_file_type(filename: str, file_content: bytes) -> str:
-    """Detect file type from filename and content"""
-    filename_lower = filename.lower()
-    
-    if filename_lower.endswith('.pdf'):
-        return 'pdf'
-    elif filename_lower.endswith(('.png', '.jpg', '.jpeg', '.bmp', '.tiff', '.gif')):
-        return 'image'
-    elif filename_lower.endswith(('.ppt', '.pptx')):
-        return 'pptx'
-    elif filename_lower.endswith(('.doc', '.docx')):
-        return 'docx'
-    elif filename_lower.endswith(('.xls', '.xlsx')):
-        return 'excel'
-    else:
-        # Try to detect from content
+# Chunk Vector Index
+# Retrieval scans an in-memory index instead of re-reading chunk embeddings from
+# MongoDB on every query. With EMBEDDING_QUANTIZATION=int8 or binary the index
+# only keeps compact codes; the top RESCORE_CANDIDATES are then rescored exactly
+# against their full-precision embeddings fetched from MongoDB.
+EMBEDDING_QUANTIZATION = os.environ.get('EMBEDDING_QUANTIZATION', 'none').lower()
+RESCORE_CANDIDATES = int(os.environ.get('RESCORE_CANDIDATES', 200))
+if EMBEDDING_QUANTIZATION not in QUANTIZATION_MODES:
+    raise ValueError(f"EMBEDDING_QUANTIZATION must be one of {QUANTIZATION_MODES}, got {EMBEDDING_QUANTIZATION!r}")
+
+# With SEARCH_SHARDS > 0 the index is published once per host into shared
+# memory shards (see shard_search.py) and scanned in parallel by a pool of
+# SEARCH_WORKERS searcher processes, instead of living in each API worker.
+SEARCH_SHARDS = int(os.environ.get('SEARCH_SHARDS', 0))
+SEARCH_WORKERS = int(os.environ.get('SEARCH_WORKERS', SEARCH_SHARDS))
+
+# Every write to document_chunks bumps a counter in the index_state collection,
+# so any worker can tell whether its index is current with one indexed lookup,
+# whichever worker made the write
+CHUNK_GENERATION_ID = 'document_chunks'
+
+chunk_index = None
+chunk_index_generation = -1
+chunk_index_target = -1
+chunk_index_refresh = None
+shard_publish = None
+shard_publish_target = -1
+shard_searcher = None
+
+async def get_chunk_generation(database) -> int:
+    """Current generation of the chunk collection"""
+    state = await database.index_state.find_one({'_id': CHUNK_GENERATION_ID})
+    return state['generation'] if state else 0
+
+async def bump_chunk_generation(database):
+    """Record a write to the chunk collection; call after every insert or delete"""
+    state = await database.index_state.find_one_and_update(
+        {'_id': CHUNK_GENERATION_ID}, {'$inc': {'generation': 1}},
+        upsert=True, return_document=ReturnDocument.AFTER
+    )
+    # If this worker serves queries, start rebuilding before the next one arrives
+    if chunk_index is not None:
+        schedule_chunk_index_refresh(state['generation'])
+    if shard_searcher is not None:
+        schedule_shard_publish(state['generation'])
+
+def build_chunk_index(ids: List[str], rows: List[np.ndarray]) -> QuantizedVectorIndex:
+    """Stack embeddings and encode them; CPU bound, so run off the event loop"""
+    vectors = np.vstack(rows) if rows else np.empty((0, 0), dtype=np.float32)
+    return QuantizedVectorIndex(ids, vectors, EMBEDDING_QUANTIZATION)
+
+async def load_chunk_index(database) -> QuantizedVectorIndex:
+    """Build the chunk index from every stored embedding"""
+    ids, rows = [], []
+    cursor = database.document_chunks.find({}, {"_id": 0, "id": 1, "embedding": 1})
+    async for chunk in cursor.batch_size(STREAM_BATCH_SIZE):
+        ids.append(chunk['id'])
+        rows.append(np.asarray(chunk['embedding'], dtype=np.float32))
+    index = await asyncio.to_thread(build_chunk_index, ids, rows)
+    logger.info(f"Loaded chunk index: {index.memory_report()}")
+    return index
+
+async def refresh_chunk_index():
+    global chunk_index, chunk_index_generation
+    # Writes that land mid-rebuild raise the target; loop until it is reached
+    while chunk_index_generation < chunk_index_target:
+        generation = chunk_index_target
+        index = await load_chunk_index(get_database())
+        # Swap in the new index; queries already holding the old one finish against it
+        chunk_index, chunk_index_generation = index, generation
+
+def schedule_chunk_index_refresh(generation: int) -> asyncio.Task:
+    """Ask for the index to be rebuilt up to a generation, starting a rebuild if none is running"""
+    global chunk_index_refresh, chunk_index_target
+    chunk_index_target = max(chunk_index_target, generation)
+    if chunk_index_refresh is None or chunk_index_refresh.done():
+        chunk_index_refresh = asyncio.create_task(refresh_chunk_index())
+        chunk_index_refresh.add_done_callback(log_chunk_index_refresh)
+    return chunk_index_refresh
+
+def log_chunk_index_refresh(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Chunk index rebuild failed: {task.exception()}")
+
+async def get_chunk_index() -> QuantizedVectorIndex:
+    """Get the chunk index, rebuilding it in the background when the chunk collection has changed"""
+    generation = await get_chunk_generation(get_database())
+    if generation > chunk_index_generation:
+        refresh = schedule_chunk_index_refresh(generation)
+        if chunk_index is None:
+            # Nothing to serve yet; shield so a cancelled query doesn't abort the shared build
+            await asyncio.shield(refresh)
+    return chunk_index
+
+def get_shard_searcher() -> shard_search.ShardSearcherPool:
+    """Get the searcher process pool with lazy initialization"""
+    global shard_searcher
+    if shard_searcher is None:
+        shard_searcher = shard_search.ShardSearcherPool(SEARCH_WORKERS)
+        logger.info(f"Started shard searcher pool with {SEARCH_WORKERS} workers")
+    return shard_searcher
+
+def shard_manifest_is_current(manifest: Optional[Dict[str, Any]], generation: int,
+                              replace_generation: Optional[str] = None) -> bool:
+    """Whether a manifest covers the chunk generation with this worker's settings"""
+    return (manifest is not None
+            and manifest['generation'] != replace_generation
+            and manifest['signature'] >= generation
+            and manifest['mode'] == EMBEDDING_QUANTIZATION
+            and len(manifest['shards']) == SEARCH_SHARDS)
+
+async def publish_shards(replace_generation: Optional[str]) -> Dict[str, Any]:
+    """Publish the chunk index as shards until the manifest reaches the target generation"""
+    database = get_database()
+    while True:
+        generation = shard_publish_target
+        # Only one worker on the host rebuilds; the others reuse its shards
+        lock_fd = await asyncio.to_thread(shard_search.acquire_publish_lock)
         try:
-            # Check if it's an image
-            Image.open(io.BytesIO(file_content))
-            return 'image'
-        except Exception:
-            pass
-        
-        # Default to pdf
-        return 'pdf'
-
-def extract_text_from_file(filename: str, file_content: bytes) -> tuple[str, str]:
-    """Extract text from various file types"""
-    file_type = detect_file_type(filename, file_content)
+            manifest = shard_search.read_manifest()
+            if not shard_manifest_is_current(manifest, generation, replace_generation):
+                index = await load_chunk_index(database)
+                publishing = asyncio.ensure_future(
+                    asyncio.to_thread(shard_search.publish, index, SEARCH_SHARDS, generation)
+                )
+                try:
+                    manifest = await asyncio.shield(publishing)
+                except asyncio.CancelledError:
+                    # Keep the host lock until the new manifest is in place, or the
+                    # next publisher would read a stale previous manifest and leak segments
+                    await asyncio.wait({publishing})
+                    raise
+                logger.info(f"Published chunk shards: {shard_search.manifest_report(manifest)}")
+        finally:
+            shard_search.release_publish_lock(lock_fd)
+        replace_generation = None
+        if manifest['signature'] >= shard_publish_target:
+            return manifest
+
+def schedule_shard_publish(generation: int, replace_generation: Optional[str] = None) -> asyncio.Task:
+    """Ask for shards covering a generation, starting a publish if none is running"""
+    global shard_publish, shard_publish_target
+    shard_publish_target = max(shard_publish_target, generation)
+    if shard_publish is None or shard_publish.done():
+        shard_publish = asyncio.create_task(publish_shards(replace_generation))
+        shard_publish.add_done_callback(log_shard_publish)
+    return shard_publish
+
+def log_shard_publish(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Publishing chunk shards failed: {task.exception()}")
+
+async def get_shard_manifest(replace_generation: Optional[str] = None) -> Dict[str, Any]:
+    """Get the published shard manifest, republishing it in the background when the chunk collection has changed
     
-    if file_type == 'pdf':
-        text = extract_text_from_pdf(file_content)
-    elif file_type == 'image':
-        text = extract_text_from_image(file_content)
-    elif file_type == 'pptx':
-        text = extract_text_from_pptx(file_content)
-    elif file_type == 'docx':
-        text = extract_text_from_docx(file_content)
-    elif file_type == 'excel':
-        text = extract_text_from_excel(file_content)
-    else:
-        raise ValueError(f"Unsupported file type: {file_type}")
+    replace_generation forces a republish if that shard generation is still the
+    published one, e.g. because its segments have gone missing.
+    """
+    generation = await get_chunk_generation(get_database())
+    manifest = shard_search.read_manifest()
+    if shard_manifest_is_current(manifest, generation, replace_generation):
+        return manifest
+    publish = schedule_shard_publish(generation, replace_generation)
+    if (manifest is not None and manifest['generation'] != replace_generation
+            and manifest['mode'] == EMBEDDING_QUANTIZATION):
+        # Serve the previous shards while the new ones are published
+        return manifest
+    # Nothing usable yet; shield so a cancelled query doesn't abort the shared publish
+    manifest = await asyncio.shield(publish)
+    if manifest['generation'] == replace_generation:
+        # A publish already under way kept the missing generation; replace it now
+        manifest = await asyncio.shield(schedule_shard_publish(generation, replace_generation))
+    return manifest
+
+async def republish_missing_shards(generation: str) -> Dict[str, Any]:
+    logger.warning("Chunk shards missing from shared memory, republishing")
+    return await get_shard_manifest(replace_generation=generation)
+
+async def search_chunk_candidates(query_embedding: List[float], candidates: int) -> tuple[List[str], List[float]]:
+    """First-pass search returning candidate chunk ids and scores, best first"""
+    if not SEARCH_SHARDS:
+        index = await get_chunk_index()
+        rows, scores = index.search(query_embedding, candidates)
+        return [index.ids[row] for row in rows], scores.tolist()
     
-    return text, file_type
+    manifest = await get_shard_manifest()
+    return await shard_search.search_with_retry(
+        get_shard_searcher(), manifest, query_embedding, candidates, republish_missing_shards
+    )
 
 async def retrieve_relevant_chunks(query: str, top_k: int = 3) -> List[Dict[str, Any]]:
     """Retrieve most relevant chunks using vector similarity"""
     query_embedding = await generate_embedding(query)
     database = get_database()
     
-    # Get chunks with reasonable limit and projection for performance
+    # First pass over the index; quantized modes over-fetch for rescoring
+    quantized = EMBEDDING_QUANTIZATION != 'none'
+    candidate_ids, scores = await search_chunk_candidates(
+        query_embedding, max(top_k, RESCORE_CANDIDATES) if quantized else top_k
+    )
+    
+    if not candidate_ids:
+        return []
+    
+    projection = {"_id": 0, "id": 1, "text": 1, "document_id": 1, "chunk_index": 1}
+    if quantized:
+        projection["embedding"] = 1
     chunks = await database.document_chunks.find(
-        {}, 
-        {"_id": 0, "embedding": 1, "text": 1, "document_id": 1, "chunk_index": 1}
-    ).limit(1000).to_list(1000)
+        {"id": {"$in": candidate_ids}}, projection
+    ).to_list(len(candidate_ids))
     
     if not chunks:
         return []
     
-    # Calculate similarities
-    similarities = []
-    for chunk in chunks:
-        chunk_embedding = chunk['embedding']
-        similarity = cosine_similarity([query_embedding], [chunk_embedding])[0][0]
-        similarities.append({
-            'chunk': chunk,
-            'similarity': float(similarity)
-        })
+    if quantized:
+        # Exact rescoring against full-precision vectors
+        exact = exact_scores(query_embedding, np.asarray([c['embedding'] for c in chunks], dtype=np.float32))
+        similarities = {c['id']: float(score) for c, score in zip(chunks, exact)}
+    else:
+        similarities = {chunk_id: float(score) for chunk_id, score in zip(candidate_ids, scores)}
     
     # Sort by similarity and get top_k
-    similarities.sort(key=lambda x: x['similarity'], reverse=True)
-    top_chunks = similarities[:top_k]
+    chunks.sort(key=lambda c: similarities[c['id']], reverse=True)
+    top_chunks = chunks[:top_k]
     
     return [{
-        'text': item['chunk']['text'],
-        'document_id': item['chunk']['document_id'],
-        'chunk_index': item['chunk']['chunk_index'],
-        'similarity': item['similarity']
-    } for item in top_chunks]
+        'text': chunk['text'],
+        'document_id': chunk['document_id'],
+        'chunk_index': chunk['chunk_index'],
+        'similarity': similarities[chunk['id']]
+    } for chunk in top_chunks]
+
+async def generate_embeddings(texts: List[str]) -> List[List[float]]:
+    """Generate embeddings for a batch of texts"""
+    return [await generate_embedding(text) for text in texts]
 
 async def generate_rag_answer(query: str, context_chunks: List[str]) -> tuple[str, int]:
     """Generate answer using LLM with retrieved context"""
@@ -319,6 +388,50 @@ Instructions: Provide a clear answer in bullet points or numbered list format. M
         logger.error(f"Error generating RAG answer: {e}")
         return "I apologize, but I encountered an error while generating the answer. Please try again.", 0
 
+# Bulk Ingestion
+# The pipeline lives in ingest.py and is shared with the offline bulk_ingest.py
+# CLI. Single uploads use the same extraction pool so extraction never runs on
+# the event loop.
+extraction_pool = None
+
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """Get the extraction process pool with lazy initialization"""
+    global extraction_pool
+    if extraction_pool is None:
+        # spawn, not fork: forking would copy the event loop and Motor's threads
+        extraction_pool = ProcessPoolExecutor(max_workers=INGEST_WORKERS, mp_context=get_context('spawn'))
+        logger.info(f"Started extraction pool with {INGEST_WORKERS} workers")
+    return extraction_pool
+
+async def ingest_files(files: Iterable[IngestFile]) -> BulkIngestReport:
+    """Run the bulk pipeline against this app's database, extraction pool and embedder"""
+    return await ingest.ingest_files(files, get_database(), get_extraction_pool(), generate_embeddings, bump_chunk_generation)
+
+# Admission Control
+# Bounds concurrent work per route group. Queries and ingestion share
+# ADMISSION_CAPACITY slots, and freed slots go to waiting queries first. That
+# priority only matters once the shared pool can fill, so the capacity must be
+# below the sum of the lane limits; QUERY_RESERVE slots are additionally kept
+# out of ingestion's reach. When a lane's queue is full, or a request waits
+# longer than ADMISSION_MAX_WAIT seconds, it gets a fast 429 with Retry-After.
+ADMISSION_CAPACITY = int(os.environ.get('ADMISSION_CAPACITY', 16))
+ADMISSION_MAX_WAIT = float(os.environ.get('ADMISSION_MAX_WAIT', 10))
+QUERY_RESERVE = int(os.environ.get('QUERY_RESERVE', 4))
+
+admission_controller = AdmissionController(ADMISSION_CAPACITY, [
+    Lane('query', priority=0,
+         max_concurrency=int(os.environ.get('QUERY_CONCURRENCY', 16)),
+         max_queue=int(os.environ.get('QUERY_QUEUE', 64)),
+         max_wait=ADMISSION_MAX_WAIT),
+    Lane('ingest', priority=1,
+         max_concurrency=max(1, min(int(os.environ.get('INGEST_CONCURRENCY', 4)), ADMISSION_CAPACITY - QUERY_RESERVE)),
+         max_queue=int(os.environ.get('INGEST_QUEUE', 16)),
+         max_wait=ADMISSION_MAX_WAIT),
+])
+if ADMISSION_CAPACITY >= sum(lane.max_concurrency for lane in admission_controller.lanes.values()):
+    logger.warning("ADMISSION_CAPACITY is at least the sum of the lane concurrency limits; "
+                   "the shared pool never fills, so queries get no priority over ingestion")
+
 # API Endpoints
 @api_router.get("/")
 async def root():
@@ -331,26 +444,17 @@ async def upload_document(file: UploadFile = File(...)):
         # Read file
         file_content = await file.read()
         
-        # Extract text
-        text, file_type = extract_text_from_file(file.filename, file_content)
+        # Extract text in the extraction pool, off the event loop
+        text, file_type = await asyncio.get_running_loop().run_in_executor(
+            get_extraction_pool(), extract_text_from_file, file.filename, file_content
+        )
         
-        if not text.strip():
+        if not has_text(text):
             raise HTTPException(status_code=400, detail=f"No text could be extracted from the {file_type.upper()} file")
         
-        # Create document
-        doc_id = str(uuid.uuid4())
-        document = {
-            'id': doc_id,
-            'filename': file.filename,
-            'file_type': file_type,
-            'upload_date': datetime.now(timezone.utc).isoformat(),
-            'file_size': len(file_content),
-            'text_length': len(text)
-        }
-        
-        # Chunk text
-        chunks = split_text_into_chunks(text, chunk_size=500)
-        document['chunk_count'] = len(chunks)
+        # Create document and chunk text
+        document, chunks = build_document_records(file.filename, file_type, text, len(file_content))
+        doc_id = document['id']
         
         # Store document
         database = get_database()
@@ -359,19 +463,10 @@ async def upload_document(file: UploadFile = File(...)):
         # Generate embeddings and store chunks
         if not chunks:
             raise HTTPException(status_code=400, detail=f"No text chunks could be created from the {file_type.upper()} file")
-            
-        for idx, chunk_text in enumerate(chunks):
-            if not chunk_text.strip():
-                continue  # Skip empty chunks
-            embedding = await generate_embedding(chunk_text)
-            chunk = {
-                'id': str(uuid.uuid4()),
-                'document_id': doc_id,
-                'chunk_index': idx,
-                'text': chunk_text,
-                'embedding': embedding
-            }
-            await database.document_chunks.insert_one(chunk)
+        
+        embeddings = await generate_embeddings(chunks)
+        await database.document_chunks.insert_many(build_chunk_records(doc_id, chunks, embeddings))
+        await bump_chunk_generation(database)
         
         logger.info(f"Document {file.filename} uploaded with {len(chunks)} chunks")
         
@@ -386,12 +481,33 @@ async def upload_document(file: UploadFile = File(...)):
         logger.error(f"Error uploading document: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.post("/documents/bulk", response_model=BulkIngestReport)
+async def bulk_upload_documents(file: UploadFile = File(...)):
+    """Ingest every document in a zip or tar archive and report per-file results"""
+    try:
+        # Members are read lazily from the spooled upload, not loaded up front
+        files = iter_archive_files(file.filename, file.file)
+        return await ingest_files(files)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in bulk upload: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @api_router.get("/documents", response_model=List[DocumentResponse])
-async def get_documents():
-    """Get all documents"""
+async def get_documents(response: Response, limit: int = MAX_DOCUMENTS_PAGE_SIZE, cursor: Optional[str] = None, stream: bool = False):
+    """Get documents, paginated with a continuation cursor or streamed as NDJSON"""
     database = get_database()
-    # Limit to 1000 documents with projection for performance
-    docs = await database.documents.find({}, {"_id": 0}).limit(1000).to_list(1000)
+    find_cursor = database.documents.find(documents_page_filter(cursor), DOCUMENT_LIST_PROJECTION).sort(DOCUMENTS_SORT)
+    
+    if stream:
+        # Export mode: no page cap, records are written as they arrive
+        return StreamingResponse(stream_ndjson(find_cursor), media_type="application/x-ndjson")
+    
+    safe_limit = max(1, min(limit, MAX_DOCUMENTS_PAGE_SIZE))
+    docs, next_cursor = await fetch_page(find_cursor, safe_limit, documents_cursor_for)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return [DocumentResponse(**doc) for doc in docs]
 
 @api_router.delete("/documents/{document_id}")
@@ -405,6 +521,7 @@ async def delete_document(document_id: str):
     
     # Delete chunks
     await database.document_chunks.delete_many({'document_id': document_id})
+    await bump_chunk_generation(database)
     
     return {"message": "Document deleted successfully"}
 
@@ -501,14 +618,37 @@ async def get_telemetry_stats():
     )
 
 @api_router.get("/telemetry/history")
-async def get_telemetry_history(limit: int = 50):
-    """Get recent telemetry records"""
+async def get_telemetry_history(response: Response, limit: int = 50, cursor: Optional[str] = None, stream: bool = False):
+    """Get telemetry records newest first, paginated with a continuation cursor or streamed as NDJSON"""
     database = get_database()
-    # Cap maximum limit to 100 for performance
-    safe_limit = min(limit, 100)
-    records = await database.telemetry.find({}, {"_id": 0}).sort("timestamp", -1).limit(safe_limit).to_list(safe_limit)
+    find_cursor = database.telemetry.find(telemetry_page_filter(cursor)).sort(TELEMETRY_SORT)
+    
+    if stream:
+        # Export mode: no page cap, records are written as they arrive
+        return StreamingResponse(stream_ndjson(find_cursor), media_type="application/x-ndjson")
+    
+    # Cap page size to 100 for performance; use the cursor to read further back
+    safe_limit = max(1, min(limit, MAX_TELEMETRY_PAGE_SIZE))
+    records, next_cursor = await fetch_page(find_cursor, safe_limit, telemetry_cursor_for)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return records
 
+@api_router.get("/retrieval/index")
+async def get_retrieval_index_stats():
+    """Get chunk index quantization mode and memory usage"""
+    if SEARCH_SHARDS:
+        report = shard_search.manifest_report(await get_shard_manifest())
+    else:
+        report = (await get_chunk_index()).memory_report()
+    report['rescore_candidates'] = RESCORE_CANDIDATES
+    return report
+
+@api_router.get("/admission/stats")
+async def get_admission_stats():
+    """Get per-lane concurrency, queue depth and rejection counters"""
+    return admission_controller.stats()
+
 @api_router.get("/dashboard/stats")
 async def get_dashboard_stats():
     """Get dashboard statistics"""
@@ -533,17 +673,40 @@ async def get_dashboard_stats():
 # Include the router in the main app
 app.include_router(api_router)
 
+# Admission runs before FastAPI parses the body, so a rejected upload is never
+# spooled; added before CORS so 429 responses still carry CORS headers
+app.add_middleware(AdmissionMiddleware, controller=admission_controller, routes={
+    ('POST', '/api/documents/upload'): 'ingest',
+    ('POST', '/api/documents/bulk'): 'ingest',
+    ('POST', '/api/query'): 'query',
+})
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Retry-After"],
 )
 
+@app.on_event("startup")
+async def ensure_indexes():
+    """Create the indexes backing keyset pagination and chunk lookups"""
+    try:
+        database = get_database()
+        await database.telemetry.create_index([("timestamp", -1), ("_id", -1)])
+        await database.document_chunks.create_index("id")
+    except Exception as e:
+        logger.warning(f"Could not create indexes: {e}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     global client
+    if extraction_pool is not None:
+        extraction_pool.shutdown(cancel_futures=True)
+    if shard_searcher is not None:
+        shard_searcher.shutdown()
     if client is not None:
         client.close()
         logger.info("MongoDB connection closed")
\ No newline at end of file
@@ -0,0 +1,221 @@
+"""Sharded scatter-gather search over chunk codes held in shared memory.
+
+The chunk index is split into SEARCH_SHARDS contiguous shards, each published
+as a pair of POSIX shared memory segments (codes and chunk ids). A manifest
+file in SHARD_DIR records the current generation, so every API worker on the
+host attaches to the same segments instead of holding its own copy.
+
+Queries fan out to a pool of searcher processes, one task per shard. Each
+searcher maps the shard once per generation and returns its local top
+candidates. The API process merges the per-shard lists.
+
+Publishing a new generation replaces the manifest and unlinks the previous
+segments. Processes that still map the old segments keep a valid mapping
+until they move on to the new generation.
+"""
+import asyncio
+import fcntl
+import heapq
+import json
+import os
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, resource_tracker, shared_memory
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from vector_index import QuantizedVectorIndex
+
+DEFAULT_SHARD_DIR = '/dev/shm/rag_shards' if os.path.isdir('/dev/shm') else os.path.join(tempfile.gettempdir(), 'rag_shards')
+SHARD_DIR = Path(os.environ.get('SHARD_DIR', DEFAULT_SHARD_DIR))
+MANIFEST_FILE = 'manifest.json'
+LOCK_FILE = 'publish.lock'
+
+
+def _untrack(segment: shared_memory.SharedMemory):
+    # Segments outlive the process that created or attached them; without this
+    # the resource tracker unlinks them when that process exits
+    try:
+        resource_tracker.unregister(segment._name, 'shared_memory')
+    except Exception:
+        pass
+
+
+def _create_segment(name: str, array: np.ndarray) -> Dict[str, Any]:
+    segment = shared_memory.SharedMemory(name=name, create=True, size=max(array.nbytes, 1))
+    _untrack(segment)
+    np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+    segment.close()
+    return {'name': name, 'shape': list(array.shape), 'dtype': array.dtype.str}
+
+
+def _attach_segment(spec: Dict[str, Any]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    segment = shared_memory.SharedMemory(name=spec['name'])
+    _untrack(segment)
+    return segment, np.ndarray(tuple(spec['shape']), dtype=np.dtype(spec['dtype']), buffer=segment.buf)
+
+
+def _unlink_segments(manifest: Dict[str, Any]):
+    for shard in manifest['shards']:
+        for spec in (shard['codes'], shard['ids']):
+            try:
+                segment = shared_memory.SharedMemory(name=spec['name'])
+                segment.close()
+                segment.unlink()
+            except FileNotFoundError:
+                pass
+
+
+_manifest_cache: Tuple[Optional[Tuple[int, int]], Optional[Dict[str, Any]]] = (None, None)
+
+
+def read_manifest() -> Optional[Dict[str, Any]]:
+    """Read the currently published shard manifest, if any, re-parsing only when the file changes"""
+    global _manifest_cache
+    path = SHARD_DIR / MANIFEST_FILE
+    try:
+        stat = path.stat()
+        key = (stat.st_mtime_ns, stat.st_ino)
+        if _manifest_cache[0] != key:
+            _manifest_cache = (key, json.loads(path.read_text()))
+        return _manifest_cache[1]
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def acquire_publish_lock() -> int:
+    """Block until this process holds the host-wide publish lock"""
+    SHARD_DIR.mkdir(parents=True, exist_ok=True)
+    fd = os.open(SHARD_DIR / LOCK_FILE, os.O_CREAT | os.O_RDWR)
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    return fd
+
+
+def release_publish_lock(fd: int):
+    fcntl.flock(fd, fcntl.LOCK_UN)
+    os.close(fd)
+
+
+def publish(index: QuantizedVectorIndex, num_shards: int, signature: int) -> Dict[str, Any]:
+    """Copy an index into shared memory shards and make it the current generation"""
+    generation = uuid.uuid4().hex[:12]
+    ids = np.array(index.ids, dtype='S') if len(index) else np.empty(0, dtype='S1')
+    bounds = np.linspace(0, len(index), num_shards + 1).astype(int)
+    shards = []
+    for shard_no, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+        shards.append({
+            'rows': int(end - start),
+            'codes': _create_segment(f"rag{generation}c{shard_no}", index.codes[start:end]),
+            'ids': _create_segment(f"rag{generation}i{shard_no}", ids[start:end]),
+        })
+    manifest = {
+        'generation': generation,
+        'signature': signature,
+        'mode': index.mode,
+        'dim': index.dim,
+        'calibration': {name: values.tolist() for name, values in index.calibration().items()},
+        'shards': shards,
+    }
+    previous = read_manifest()
+    SHARD_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = SHARD_DIR / f"{MANIFEST_FILE}.{generation}"
+    tmp_path.write_text(json.dumps(manifest))
+    os.replace(tmp_path, SHARD_DIR / MANIFEST_FILE)
+    if previous is not None:
+        _unlink_segments(previous)
+    return manifest
+
+
+def manifest_report(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """Summarize a manifest in the same shape as QuantizedVectorIndex.memory_report"""
+    chunks = sum(shard['rows'] for shard in manifest['shards'])
+    index_bytes = sum(
+        int(np.prod(shard['codes']['shape'])) * np.dtype(shard['codes']['dtype']).itemsize
+        for shard in manifest['shards']
+    )
+    float32_bytes = chunks * manifest['dim'] * 4
+    return {
+        'mode': manifest['mode'],
+        'chunks': chunks,
+        'dimensions': manifest['dim'],
+        'index_bytes': index_bytes,
+        'float32_bytes': float32_bytes,
+        'compression_ratio': float32_bytes / index_bytes if index_bytes else 0.0,
+        'shards': len(manifest['shards']),
+        'generation': manifest['generation'],
+    }
+
+
+# Searcher process state: shard views for the generation last searched
+_attached_generation = None
+_attached: Dict[int, Tuple[List[shared_memory.SharedMemory], QuantizedVectorIndex]] = {}
+
+
+def _shard_index(manifest: Dict[str, Any], shard_no: int) -> QuantizedVectorIndex:
+    global _attached_generation
+    if manifest['generation'] != _attached_generation:
+        # Drop the array views before closing the segments they point into
+        stale = [segments for segments, _ in _attached.values()]
+        _attached.clear()
+        for segments in stale:
+            for segment in segments:
+                segment.close()
+        _attached_generation = manifest['generation']
+    if shard_no not in _attached:
+        shard = manifest['shards'][shard_no]
+        codes_segment, codes = _attach_segment(shard['codes'])
+        ids_segment, ids = _attach_segment(shard['ids'])
+        index = QuantizedVectorIndex.from_arrays(ids, manifest['mode'], manifest['dim'], codes, manifest['calibration'])
+        _attached[shard_no] = ([codes_segment, ids_segment], index)
+    return _attached[shard_no][1]
+
+
+def search_shard(manifest: Dict[str, Any], shard_no: int, query: List[float], candidates: int) -> Tuple[List[str], List[float]]:
+    """Runs in a searcher process: top candidates from one shard"""
+    index = _shard_index(manifest, shard_no)
+    rows, scores = index.search(query, candidates)
+    return [index.ids[row].decode() for row in rows], scores.tolist()
+
+
+class ShardSearcherPool:
+    """Pool of searcher processes that scatter a query across shards and gather the results"""
+
+    def __init__(self, workers: int):
+        # spawn keeps searchers free of the API process's event loop and client threads
+        self.pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'))
+
+    async def search(self, manifest: Dict[str, Any], query: Sequence[float], candidates: int) -> Tuple[List[str], List[float]]:
+        loop = asyncio.get_running_loop()
+        query = [float(value) for value in query]
+        results = await asyncio.gather(*[
+            loop.run_in_executor(self.pool, search_shard, manifest, shard_no, query, candidates)
+            for shard_no, shard in enumerate(manifest['shards']) if shard['rows']
+        ])
+        merged = heapq.nlargest(candidates, (
+            (score, chunk_id) for ids, scores in results for chunk_id, score in zip(ids, scores)
+        ))
+        return [chunk_id for _, chunk_id in merged], [score for score, _ in merged]
+
+    def shutdown(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+async def search_with_retry(searcher: ShardSearcherPool, manifest: Dict[str, Any], query: Sequence[float],
+                            candidates: int, republish: Callable[[str], Awaitable[Dict[str, Any]]]) -> Tuple[List[str], List[float]]:
+    """Search a manifest, retrying once if its segments have been unlinked
+
+    A publish from another worker unlinks the previous generation, so a search
+    that raced it is retried against the newly published manifest. republish
+    is called with the generation only if that same generation is still the
+    published one, i.e. its segments vanished (e.g. /dev/shm was cleared).
+    """
+    try:
+        return await searcher.search(manifest, query, candidates)
+    except FileNotFoundError:
+        latest = read_manifest()
+        if latest is None or latest['generation'] == manifest['generation']:
+            latest = await republish(manifest['generation'])
+        return await searcher.search(latest, query, candidates)
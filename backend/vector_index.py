@@ -0,0 +1,160 @@
+"""In-memory chunk vector index with optional int8 / binary quantization.
+
+The index only holds what the first retrieval pass needs: chunk ids and one
+code row per chunk. In the quantized modes the full-precision vectors stay in
+MongoDB and are fetched only for the few hundred candidates that get rescored.
+
+Modes:
+    none    float32 unit vectors, exact cosine similarity
+    int8    per-dimension scalar quantization to int8 (4x smaller than float32)
+    binary  1 bit per dimension, thresholded at the corpus mean and packed into
+            uint8; ranked by Hamming distance via popcount (32x smaller)
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+QUANTIZATION_MODES = ('none', 'int8', 'binary')
+
+# Rows scored per matmul block; keeps the float32 temporary for int8 scans cache sized
+SCAN_BLOCK_ROWS = 4096
+
+if hasattr(np, 'bitwise_count'):
+    def popcount(values: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(values)
+else:
+    _POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def popcount(values: np.ndarray) -> np.ndarray:
+        return _POPCOUNT_TABLE[values]
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length so dot products are cosine similarities"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def exact_scores(query: Sequence[float], vectors: np.ndarray) -> np.ndarray:
+    """Exact cosine similarity between a query and each row of vectors"""
+    return normalize(vectors) @ normalize(query)
+
+
+def top_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first"""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    rows = np.argpartition(-scores, k - 1)[:k]
+    return rows[np.argsort(-scores[rows], kind='stable')]
+
+
+class QuantizedVectorIndex:
+    """Chunk vectors encoded for a fast first-pass similarity scan"""
+
+    def __init__(self, ids: List[str], vectors: np.ndarray, mode: str = 'none'):
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {mode}")
+        self.ids = ids
+        self.mode = mode
+        self.dim = vectors.shape[1] if len(vectors) else 0
+        unit = normalize(vectors) if len(vectors) else np.empty((0, 0), dtype=np.float32)
+
+        if mode == 'none':
+            self.codes = unit
+        elif mode == 'int8':
+            self.offset = unit.min(axis=0) if len(unit) else np.zeros(0, dtype=np.float32)
+            span = (unit.max(axis=0) - self.offset) if len(unit) else np.zeros(0, dtype=np.float32)
+            self.scale = np.where(span > 0, span / 255.0, 1.0).astype(np.float32)
+            self.codes = (np.rint((unit - self.offset) / self.scale) - 128).astype(np.int8)
+        else:
+            self.threshold = unit.mean(axis=0) if len(unit) else np.zeros(0, dtype=np.float32)
+            self.codes = np.packbits(unit > self.threshold, axis=1)
+
+    @classmethod
+    def from_arrays(cls, ids: Sequence, mode: str, dim: int, codes: np.ndarray,
+                    calibration: Dict[str, np.ndarray]) -> 'QuantizedVectorIndex':
+        """Wrap already-encoded codes, e.g. a view onto a shared memory shard"""
+        index = cls.__new__(cls)
+        index.ids = ids
+        index.mode = mode
+        index.codes = codes
+        index.dim = dim
+        for name, values in calibration.items():
+            setattr(index, name, np.asarray(values, dtype=np.float32))
+        return index
+
+    def calibration(self) -> Dict[str, np.ndarray]:
+        """Per-dimension vectors needed to encode queries for this index"""
+        if self.mode == 'int8':
+            return {'offset': self.offset, 'scale': self.scale}
+        if self.mode == 'binary':
+            return {'threshold': self.threshold}
+        return {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the code matrix and its calibration vectors"""
+        return self.codes.nbytes + sum(values.nbytes for values in self.calibration().values())
+
+    @property
+    def float32_nbytes(self) -> int:
+        """Bytes the same vectors would take as an unquantized float32 matrix"""
+        return len(self) * self.dim * 4
+
+    def memory_report(self) -> Dict[str, float]:
+        return {
+            'mode': self.mode,
+            'chunks': len(self),
+            'dimensions': self.dim,
+            'index_bytes': self.nbytes,
+            'float32_bytes': self.float32_nbytes,
+            'compression_ratio': self.float32_nbytes / self.nbytes if self.nbytes else 0.0,
+        }
+
+    def scores(self, query: Sequence[float]) -> np.ndarray:
+        """First-pass scores for every row; higher is more similar"""
+        unit_query = normalize(query)
+        if self.mode == 'none':
+            return self.codes @ unit_query
+        if self.mode == 'int8':
+            # q.x ~= q.(offset + (code + 128) * scale); the constant term does not
+            # change the ranking but keeps scores on the cosine scale
+            weights = unit_query * self.scale
+            constant = float(unit_query @ self.offset + 128.0 * weights.sum())
+            out = np.empty(len(self), dtype=np.float32)
+            for start in range(0, len(self), SCAN_BLOCK_ROWS):
+                block = self.codes[start:start + SCAN_BLOCK_ROWS]
+                out[start:start + len(block)] = block.astype(np.float32) @ weights
+            return out + constant
+        query_code = np.packbits(unit_query > self.threshold)
+        hamming = popcount(np.bitwise_xor(self.codes, query_code)).sum(axis=1, dtype=np.int32)
+        return -hamming.astype(np.float32)
+
+    def search(self, query: Sequence[float], candidates: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the best candidate rows and their first-pass scores"""
+        if not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = self.scores(query)
+        rows = top_rows(scores, candidates)
+        return rows, scores[rows]
+
+
+def recall_at_k(vectors: np.ndarray, queries: np.ndarray, mode: str, k: int = 10,
+                rescore_candidates: int = 200, index: Optional[QuantizedVectorIndex] = None) -> float:
+    """Fraction of the exact top-k found by a quantized first pass plus exact rescoring"""
+    if index is None:
+        index = QuantizedVectorIndex([str(i) for i in range(len(vectors))], vectors, mode)
+    unit = normalize(vectors)
+    hits = 0
+    for query in queries:
+        exact = set(top_rows(unit @ normalize(query), k).tolist())
+        rows, _ = index.search(query, max(k, rescore_candidates) if mode != 'none' else k)
+        rescored = rows[top_rows(unit[rows] @ normalize(query), k)]
+        hits += len(exact & set(rescored.tolist()))
+    return hits / (len(queries) * min(k, len(vectors))) if len(queries) else 1.0
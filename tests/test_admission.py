@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+
+from admission import AdmissionController, AdmissionMiddleware, AdmissionRejected, Lane
+
+
+def make_controller(capacity=2, max_queue=4, max_wait=5.0):
+    return AdmissionController(capacity, [
+        Lane('query', priority=0, max_concurrency=2, max_queue=max_queue, max_wait=max_wait),
+        Lane('ingest', priority=1, max_concurrency=2, max_queue=max_queue, max_wait=max_wait),
+    ])
+
+
+def test_freed_slot_goes_to_higher_priority_lane():
+    async def scenario():
+        controller = make_controller()
+        held = [await controller.acquire('ingest'), await controller.acquire('ingest')]
+
+        # The shared pool is full; ingest queues first, then a query arrives
+        ingest_waiter = asyncio.create_task(controller.acquire('ingest'))
+        await asyncio.sleep(0)
+        query_waiter = asyncio.create_task(controller.acquire('query'))
+        await asyncio.sleep(0)
+
+        controller.release(held.pop())
+        query_permit = await asyncio.wait_for(query_waiter, 1)
+        assert not ingest_waiter.done()
+
+        controller.release(held.pop())
+        ingest_permit = await asyncio.wait_for(ingest_waiter, 1)
+        controller.release(query_permit)
+        controller.release(ingest_permit)
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects_immediately():
+    async def scenario():
+        controller = make_controller(capacity=1, max_queue=1)
+        held = await controller.acquire('query')
+        waiter = asyncio.create_task(controller.acquire('query'))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire('query')
+
+        assert rejected.value.reason == "queue is full"
+        assert rejected.value.retry_after >= 1
+        lane = controller.lanes['query']
+        assert (lane.rejected, lane.timed_out) == (1, 0)
+        controller.release(held)
+        controller.release(await waiter)
+
+    asyncio.run(scenario())
+
+
+def test_wait_timeout_counts_and_dequeues():
+    async def scenario():
+        controller = make_controller(capacity=1, max_wait=0.01)
+        held = await controller.acquire('ingest')
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire('ingest')
+
+        assert rejected.value.reason == "wait timed out"
+        stats = controller.stats()['lanes']['ingest']
+        assert (stats['timed_out'], stats['rejected'], stats['queued']) == (1, 1, 0)
+        controller.release(held)
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancel_after_grant_returns_the_slot():
+    async def scenario():
+        controller = make_controller(capacity=1)
+        held = await controller.acquire('query')
+        waiter = asyncio.create_task(controller.acquire('query'))
+        await asyncio.sleep(0)
+
+        # The slot is handed to the waiter, which is cancelled before it resumes
+        controller.release(held)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert controller.active == 0
+        assert controller.lanes['query'].active == 0
+        controller.release(await asyncio.wait_for(controller.acquire('query'), 1))
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
+
+class Upload:
+    """Minimal ASGI request that records whether the app read its body"""
+
+    def __init__(self, path='/api/documents/bulk'):
+        self.scope = {'type': 'http', 'method': 'POST', 'path': path}
+        self.body_read = False
+        self.messages = []
+
+    async def receive(self):
+        self.body_read = True
+        return {'type': 'http.request', 'body': b'archive bytes', 'more_body': False}
+
+    async def send(self, message):
+        self.messages.append(message)
+
+    @property
+    def status(self):
+        return self.messages[0]['status']
+
+    @property
+    def headers(self):
+        return dict(self.messages[0]['headers'])
+
+
+def test_middleware_rejects_before_the_body_is_read():
+    async def scenario():
+        controller = AdmissionController(4, [
+            Lane('ingest', priority=1, max_concurrency=1, max_queue=0, max_wait=5.0),
+        ])
+        release_first = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await receive()
+            await release_first.wait()
+            await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+            await send({'type': 'http.response.body', 'body': b'{}'})
+
+        middleware = AdmissionMiddleware(app, controller, {('POST', '/api/documents/bulk'): 'ingest'})
+        first, second = Upload(), Upload()
+        running = asyncio.create_task(middleware(first.scope, first.receive, first.send))
+        await asyncio.sleep(0)
+
+        await middleware(second.scope, second.receive, second.send)
+        assert second.status == 429
+        assert not second.body_read
+        assert int(second.headers[b'retry-after']) >= 1
+
+        release_first.set()
+        await running
+        assert first.status == 200
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_middleware_passes_unrouted_requests_through():
+    async def scenario():
+        controller = AdmissionController(1, [Lane('query', priority=0, max_concurrency=1, max_queue=0, max_wait=5.0)])
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append((scope['path'], controller.active))
+
+        middleware = AdmissionMiddleware(app, controller, {('POST', '/api/query'): 'query'})
+        for path in ('/api/documents', '/api/query'):
+            request = Upload(path)
+            await middleware(request.scope, request.receive, request.send)
+
+        assert seen == [('/api/documents', 0), ('/api/query', 1)]
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
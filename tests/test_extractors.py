@@ -0,0 +1,107 @@
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from extractors import (
+    EXTRACTORS, Segment, count_words, detect_file_type, extract_text_from_file, has_text, iter_excel_segments
+)
+
+BACKEND_DIR = Path(__file__).resolve().parents[1] / "backend"
+PARSING_LIBRARIES = ('PIL', 'pymupdf', 'openpyxl', 'pptx', 'docx', 'pytesseract', 'pdf2image')
+
+
+def test_importing_extractors_loads_no_parsing_library():
+    # A fresh interpreter, since other tests import these libraries
+    code = f"import sys, extractors; print(','.join(m for m in {PARSING_LIBRARIES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == ""
+
+
+def test_registry_keeps_baseline_order():
+    assert list(EXTRACTORS) == ['pdf', 'image', 'pptx', 'docx', 'excel']
+
+
+@pytest.mark.parametrize("filename, file_type", [
+    ("report.pdf", 'pdf'),
+    ("REPORT.PDF", 'pdf'),
+    ("scan.png", 'image'),
+    ("photo.JPEG", 'image'),
+    ("diagram.tiff", 'image'),
+    ("slides.ppt", 'pptx'),
+    ("slides.pptx", 'pptx'),
+    ("letter.doc", 'docx'),
+    ("letter.docx", 'docx'),
+    ("budget.xls", 'excel'),
+    ("budget.xlsx", 'excel'),
+    ("archive.pdf.png", 'image'),
+])
+def test_detect_file_type_by_extension(filename, file_type):
+    assert detect_file_type(filename, b"") == file_type
+
+
+def test_unknown_content_falls_back_to_pdf():
+    pytest.importorskip("PIL")
+
+    assert detect_file_type("upload", b"%PDF-1.4 not an image") == 'pdf'
+
+
+def workbook_bytes(sheets):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for title, rows in sheets.items():
+        sheet = workbook.create_sheet(title)
+        for row in rows:
+            sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def test_wide_sheets_split_into_column_windows():
+    header = [f"col{i}" for i in range(10)]
+    content = workbook_bytes({"Wide": [header, list(range(10)), list(range(10, 20))]})
+
+    segments = list(iter_excel_segments(content, header_words=4))
+
+    assert segments == [
+        Segment("Sheet: Wide (columns 1-4)\ncol0 | col1 | col2 | col3", ["0 | 1 | 2 | 3", "10 | 11 | 12 | 13"]),
+        Segment("Sheet: Wide (columns 5-8)\ncol4 | col5 | col6 | col7", ["4 | 5 | 6 | 7", "14 | 15 | 16 | 17"]),
+        Segment("Sheet: Wide (columns 9-10)\ncol8 | col9", ["8 | 9", "18 | 19"]),
+    ]
+
+
+def test_trailing_empty_cells_are_trimmed():
+    content = workbook_bytes({"Sheet": [
+        ["a", "b", "c", "d"],
+        ["x", None, "z", None],
+        [None, None, None, None],
+        ["y", None, None, None],
+    ]})
+
+    assert list(iter_excel_segments(content)) == [Segment("Sheet: Sheet\na | b | c | d", ["x |  | z", "y"])]
+
+
+def test_empty_and_header_only_sheets():
+    content = workbook_bytes({"Empty": [], "Header": [["id", "value"]], "Blank": [[None, None]]})
+
+    assert list(iter_excel_segments(content)) == [Segment("Sheet: Header\nid | value", [])]
+
+
+def test_excel_extraction_returns_segments():
+    content = workbook_bytes({"One": [["k", "v"], ["a", 1]], "Two": [["k", "v"], ["b", 2.0]]})
+
+    text, file_type = extract_text_from_file("report.xlsx", content)
+
+    assert file_type == "excel"
+    assert text == [Segment("Sheet: One\nk | v", ["a | 1"]), Segment("Sheet: Two\nk | v", ["b | 2"])]
+    assert has_text(text)
+    assert not has_text([Segment(" \n", [])])
+
+
+def test_count_words_ignores_cell_separators():
+    assert count_words("a |  | c | two words") == 4
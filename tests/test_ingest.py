@@ -0,0 +1,217 @@
+import asyncio
+import io
+import tarfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("pydantic")
+openpyxl = pytest.importorskip("openpyxl")
+
+import ingest
+from extractors import Segment, count_words, extract_text_from_file
+from ingest import BulkWriter, build_document_records, ingest_files, iter_archive_files, split_segments_into_chunks
+
+
+class StubCollection:
+    def __init__(self, name, log):
+        self.name = name
+        self.log = log
+
+    async def insert_many(self, records, ordered=True):
+        self.log.append((self.name, list(records)))
+
+
+class StubDatabase:
+    def __init__(self):
+        self.log = []
+        self.documents = StubCollection('documents', self.log)
+        self.document_chunks = StubCollection('document_chunks', self.log)
+
+    def stored(self, name):
+        return [record for collection, records in self.log if collection == name for record in records]
+
+
+def workbook_bytes(label):
+    workbook = openpyxl.Workbook()
+    workbook.active.append(["name", "value"])
+    workbook.active.append([label, 1])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def test_segments_pack_rows_under_repeated_header():
+    header = "Sheet: Stock\nname | qty | note"
+    rows = [f"item{i} | {i} | in stock" for i in range(40)]
+
+    chunks = split_segments_into_chunks([Segment(header, rows), Segment("Sheet: Empty\nid", [])], chunk_size=50)
+
+    assert chunks[-1] == "Sheet: Empty\nid"
+    assert len(chunks) > 2
+    for chunk in chunks[:-1]:
+        assert chunk.startswith(header + "\n")
+        assert count_words(chunk) <= 50
+    assert [line for chunk in chunks[:-1] for line in chunk.split("\n")[2:]] == rows
+
+
+def test_oversized_row_is_cut_under_its_header():
+    row = " | ".join(f"value{i}" for i in range(30))
+
+    chunks = split_segments_into_chunks([Segment("Sheet: S\nh", [row])], chunk_size=10)
+
+    assert len(chunks) > 1
+    assert all(chunk.startswith("Sheet: S\nh\n") for chunk in chunks)
+
+
+def test_wide_sheet_chunks_all_carry_their_header():
+    workbook = openpyxl.Workbook()
+    workbook.active.append([f"column {i}" for i in range(300)])
+    for row in range(5):
+        workbook.active.append([f"r{row}c{i}" for i in range(300)])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    text, file_type = extract_text_from_file("wide.xlsx", buffer.getvalue())
+    _, chunks = build_document_records("wide.xlsx", file_type, text, 0)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        title, header, *rows = chunk.split("\n")
+        assert title.startswith("Sheet: Sheet (columns ")
+        assert header.startswith("column ")
+        assert len(rows) == 5
+        assert count_words(chunk) <= 500
+
+
+MEMBERS = {
+    'docs/a.txt': b'alpha',
+    'docs/.hidden': b'skip',
+    '__MACOSX/docs/._a.txt': b'skip',
+    'b.txt': b'beta',
+}
+
+
+def test_zip_members_skip_directories_and_hidden_entries():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('docs/', b'')
+        for name, content in MEMBERS.items():
+            archive.writestr(name, content)
+
+    assert list(iter_archive_files('a.zip', buffer)) == [('docs/a.txt', b'alpha'), ('b.txt', b'beta')]
+
+
+def test_tar_members_skip_directories_and_hidden_entries():
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        directory = tarfile.TarInfo('docs')
+        directory.type = tarfile.DIRTYPE
+        archive.addfile(directory)
+        for name, content in MEMBERS.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+
+    assert list(iter_archive_files('a.tar.gz', buffer)) == [('docs/a.txt', b'alpha'), ('b.txt', b'beta')]
+
+
+def test_non_archive_is_rejected():
+    with pytest.raises(ValueError):
+        list(iter_archive_files('notes.txt', io.BytesIO(b'plain text, not an archive')))
+
+
+def test_corrupt_zip_member_is_reported_not_raised():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('bad.txt', b'x' * 64)
+        archive.writestr('good.txt', b'y' * 64)
+    data = bytearray(buffer.getvalue())
+    data[data.index(b'x' * 64)] = ord('z')
+
+    (bad_name, bad), (good_name, good) = iter_archive_files('a.zip', io.BytesIO(bytes(data)))
+
+    assert bad_name == 'bad.txt' and isinstance(bad, zipfile.BadZipFile)
+    assert (good_name, good) == ('good.txt', b'y' * 64)
+
+
+def test_bulk_writer_flushes_at_batch_size_documents_first():
+    async def scenario():
+        database = StubDatabase()
+        writer = BulkWriter(database, batch_size=3)
+
+        await writer.add({'id': 'd1'}, [{'id': 'c1'}, {'id': 'c2'}])
+        assert database.log == []
+        await writer.add({'id': 'd2'}, [{'id': 'c3'}])
+        assert [name for name, _ in database.log] == ['documents', 'document_chunks']
+
+        # Documents without chunks flush on the document count alone
+        for n in range(3):
+            await writer.add({'id': f'e{n}'}, [])
+        assert len(database.stored('documents')) == 5
+        await writer.flush()
+        assert len(database.log) == 3
+
+    asyncio.run(scenario())
+
+
+async def fake_embeddings(texts):
+    return [[float(len(text))] for text in texts]
+
+
+def run_ingest(files, embed=fake_embeddings):
+    database = StubDatabase()
+    written = []
+
+    async def on_written(db):
+        written.append(db)
+
+    async def scenario():
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            return await ingest_files(files, database, pool, embed, on_written, max_in_flight=2)
+
+    try:
+        return asyncio.run(scenario()), database, written
+    except Exception as e:
+        return e, database, written
+
+
+def test_report_is_in_input_order_with_failure_entries():
+    files = [
+        ('one.xlsx', workbook_bytes('one')),
+        ('broken.xlsx', b'not a workbook'),
+        ('unreadable.xlsx', OSError("Permission denied")),
+        ('two.xlsx', workbook_bytes('two')),
+        ('three.xlsx', workbook_bytes('three')),
+    ]
+
+    report, database, written = run_ingest(files)
+
+    assert [r.index for r in report.files] == list(range(len(files)))
+    assert [r.filename for r in report.files] == [name for name, _ in files]
+    assert [r.success for r in report.files] == [True, False, False, True, True]
+    assert report.files[2].error == "Permission denied"
+    assert report.files[1].error
+    assert (report.total_files, report.succeeded, report.failed) == (5, 3, 2)
+    assert len(database.stored('documents')) == 3
+    assert len(database.stored('document_chunks')) == report.total_chunks == 3
+    assert written == [database]
+
+
+def test_stored_batches_are_flushed_and_indexed_when_ingest_fails(monkeypatch):
+    monkeypatch.setattr(ingest, 'BULK_EMBED_BATCH_SIZE', 1)
+    calls = []
+
+    async def flaky_embeddings(texts):
+        calls.append(texts)
+        if len(calls) > 1:
+            raise RuntimeError("embedding provider unavailable")
+        return await fake_embeddings(texts)
+
+    files = [('one.xlsx', workbook_bytes('one')), ('two.xlsx', workbook_bytes('two'))]
+    error, database, written = run_ingest(files, flaky_embeddings)
+
+    assert isinstance(error, RuntimeError)
+    assert len(database.stored('documents')) == 1
+    assert written == [database]
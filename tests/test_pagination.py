@@ -0,0 +1,78 @@
+import pytest
+
+pytest.importorskip("bson")
+pytest.importorskip("fastapi")
+
+from bson import ObjectId
+from fastapi import HTTPException
+
+from pagination import (
+    decode_cursor,
+    documents_cursor_for,
+    documents_page_filter,
+    encode_cursor,
+    telemetry_cursor_for,
+    telemetry_page_filter,
+)
+
+
+def test_cursor_round_trip():
+    oid = ObjectId()
+    token = encode_cursor({'ts': '2025-12-03T10:00:00+00:00', 'oid': str(oid)})
+
+    assert "=" not in token
+    assert decode_cursor(token) == {'ts': '2025-12-03T10:00:00+00:00', 'oid': oid}
+
+
+@pytest.mark.parametrize("token", [
+    "not-a-cursor",
+    encode_cursor({'ts': 'x'}),
+    encode_cursor({'oid': 'not-an-object-id'}),
+    "bnVsbA",  # base64 of "null"
+    documents_cursor_for({'_id': ObjectId()}),
+    encode_cursor({'ts': {'$gt': ''}, 'oid': str(ObjectId())}),
+    encode_cursor({'ts': None, 'oid': str(ObjectId())}),
+])
+def test_invalid_cursor_is_400(token):
+    with pytest.raises(HTTPException) as excinfo:
+        telemetry_page_filter(token)
+    assert excinfo.value.status_code == 400
+
+
+def test_documents_filter_seeks_past_last_id():
+    oid = ObjectId()
+    assert documents_page_filter(None) == {}
+    assert documents_page_filter(documents_cursor_for({'_id': oid})) == {'_id': {'$gt': oid}}
+
+
+def matches(record, query):
+    """Evaluate the subset of Mongo query operators the telemetry filter uses"""
+    if '$or' in query:
+        return any(matches(record, clause) for clause in query['$or'])
+    for field, condition in query.items():
+        if isinstance(condition, dict):
+            if not record[field] < condition['$lt']:
+                return False
+        elif record[field] != condition:
+            return False
+    return True
+
+
+def test_telemetry_pages_break_timestamp_ties_on_id():
+    # Several records share a timestamp; paging must neither skip nor repeat them
+    records = [
+        {'_id': ObjectId(), 'timestamp': ts}
+        for ts in ['2025-01-02', '2025-01-02', '2025-01-02', '2025-01-01', '2025-01-01']
+    ]
+    ordered = sorted(records, key=lambda r: (r['timestamp'], r['_id']), reverse=True)
+
+    seen, cursor = [], None
+    while True:
+        query = telemetry_page_filter(cursor)
+        page = [r for r in ordered if matches(r, query)][:2]
+        if not page:
+            break
+        seen.extend(page)
+        cursor = telemetry_cursor_for(page[-1])
+
+    assert seen == ordered
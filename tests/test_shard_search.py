@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import shard_search
+from vector_index import QUANTIZATION_MODES, QuantizedVectorIndex
+
+
+@pytest.fixture(autouse=True)
+def shard_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(shard_search, 'SHARD_DIR', tmp_path)
+    yield tmp_path
+    manifest = shard_search.read_manifest()
+    if manifest is not None:
+        shard_search._unlink_segments(manifest)
+
+
+@pytest.fixture(scope="module")
+def searcher():
+    pool = shard_search.ShardSearcherPool(2)
+    yield pool
+    pool.shutdown()
+
+
+def make_index(mode, rows=500, dim=32, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+    return QuantizedVectorIndex([f"chunk-{i}" for i in range(rows)], vectors, mode), vectors
+
+
+@pytest.mark.parametrize("mode", QUANTIZATION_MODES)
+def test_scatter_gather_matches_single_index(searcher, mode):
+    index, vectors = make_index(mode)
+    manifest = shard_search.publish(index, 3, signature=7)
+
+    assert shard_search.read_manifest() == manifest
+    report = shard_search.manifest_report(manifest)
+    assert (report['chunks'], report['shards'], report['index_bytes']) == (len(index), 3, index.codes.nbytes)
+
+    for query in vectors[:5]:
+        rows, scores = index.search(query, 20)
+        ids, merged_scores = asyncio.run(searcher.search(manifest, query, 20))
+        assert merged_scores == pytest.approx(scores.tolist(), abs=1e-5)
+        if mode != 'binary':
+            # Hamming scores tie, so only the continuous modes have a unique order
+            assert ids == [index.ids[row] for row in rows]
+
+
+def test_publish_unlinks_previous_generation():
+    index, vectors = make_index('int8')
+    first = shard_search.publish(index, 2, signature=1)
+    second = shard_search.publish(index, 2, signature=2)
+
+    assert shard_search.read_manifest()['generation'] == second['generation']
+    with pytest.raises(FileNotFoundError):
+        shard_search.search_shard(first, 0, vectors[0].tolist(), 5)
+    ids, _ = shard_search.search_shard(second, 0, vectors[0].tolist(), 5)
+    assert ids[0] == "chunk-0"
+
+
+def test_retry_uses_newer_generation_without_republishing(searcher):
+    index, vectors = make_index('none')
+    stale = shard_search.publish(index, 2, signature=1)
+    shard_search.publish(index, 2, signature=2)
+
+    async def republish(generation):
+        raise AssertionError("a newer generation was already published")
+
+    ids, _ = asyncio.run(shard_search.search_with_retry(searcher, stale, vectors[3], 1, republish))
+    assert ids == ["chunk-3"]
+
+
+def test_retry_republishes_when_current_segments_vanish(searcher):
+    index, vectors = make_index('none')
+    manifest = shard_search.publish(index, 2, signature=1)
+    shard_search._unlink_segments(manifest)
+    republished = []
+
+    async def republish(generation):
+        republished.append(generation)
+        return shard_search.publish(index, 2, signature=1)
+
+    ids, _ = asyncio.run(shard_search.search_with_retry(searcher, manifest, vectors[3], 1, republish))
+    assert ids == ["chunk-3"]
+    assert republished == [manifest['generation']]
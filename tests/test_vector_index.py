@@ -0,0 +1,46 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from vector_index import QUANTIZATION_MODES, QuantizedVectorIndex, exact_scores, recall_at_k
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(2000, 64)).astype(np.float32)
+    picks = rng.choice(len(vectors), size=50, replace=False)
+    queries = vectors[picks] + rng.normal(size=(50, 64)).astype(np.float32) * 0.3
+    return vectors, queries
+
+
+def test_int8_scores_track_exact_cosine(corpus):
+    vectors, queries = corpus
+    index = QuantizedVectorIndex([str(i) for i in range(len(vectors))], vectors, 'int8')
+
+    for query in queries:
+        error = np.abs(index.scores(query) - exact_scores(query, vectors))
+        # Half a quantization step per dimension keeps the error well under 0.01
+        assert error.max() < 0.01
+
+
+@pytest.mark.parametrize("mode, min_recall", [
+    ('none', 1.0),
+    ('int8', 0.99),
+    ('binary', 0.7),
+])
+def test_recall_after_rescoring(corpus, mode, min_recall):
+    vectors, queries = corpus
+
+    assert recall_at_k(vectors, queries, mode, k=10, rescore_candidates=200) >= min_recall
+
+
+@pytest.mark.parametrize("mode", QUANTIZATION_MODES)
+def test_empty_index(mode):
+    index = QuantizedVectorIndex([], np.empty((0, 0), dtype=np.float32), mode)
+
+    rows, scores = index.search([0.1, 0.2, 0.3], 10)
+    assert len(rows) == 0 and len(scores) == 0
+    report = index.memory_report()
+    assert report['chunks'] == 0
+    assert report['compression_ratio'] == 0.0